@@ -0,0 +1,458 @@
+import fcntl
+import json
+import mmap
+import os
+import re
+import shutil
+import struct
+import tempfile
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.files.storage import Storage
+
+from .models import MangaChapter, MangaChapterPage
+from .storage import page_storage
+
+
+LOCAL_HEADER = struct.Struct('<4s5H3L2H')  # Fixed part of a zip local file header
+RECOVERY_HEADER = struct.Struct('<Q')  # Offset the saved central directory goes back to
+COPY_BUFFER_SIZE = 1024 * 1024
+# "0001 - Name [42]/0003.webp" in series archives (1 is the chapter number,
+# 42 its id), "0003.webp" in chapter archives
+PAGE_ENTRY_PATTERN = re.compile(r'^(?:(\d+) - [^/]*\[(\d+)\]/)?(\d+)\.\w+$')
+# Pages of the next chapter warmed in the page cache when a chapter is opened
+READ_AHEAD_PAGES = 3
+CHAPTER_DIR_PATTERN = re.compile(r'^\d+ - [^/]*\[(\d+)\]/')
+
+
+def _safe(name: str) -> str:
+    return re.sub(r'[\\/:*?"<>|]+', '_', name).strip() or 'untitled'
+
+
+def archive_root() -> str:
+    return getattr(settings, 'ARCHIVE_ROOT', os.path.join(settings.MEDIA_ROOT, 'archives'))
+
+
+def series_archive_path(manga_id: int) -> str:
+    """Where the series archive of a Manga lives."""
+    return os.path.join(archive_root(), f"{manga_id}.cbz")
+
+
+def chapter_dir(chapter: MangaChapter) -> str:
+    """
+    Folder of a chapter inside a series archive. It ends with the chapter
+    id, as several chapters (e.g. scanlations) can share a number.
+    """
+    return f"{chapter.number:04d} - {_safe(chapter.name)} [{chapter.pk}]/"
+
+
+def page_entry_name(page: MangaChapterPage, prefix: str = '') -> str:
+    extension = os.path.splitext(page.file.name)[1]
+    return f"{prefix}{page.number:04d}{extension}"
+
+
+def comic_info(chapter: MangaChapter, page_count: int) -> str:
+    """ComicInfo.xml read by most CBZ readers."""
+    return (
+        '<?xml version="1.0" encoding="utf-8"?>\n'
+        '<ComicInfo>\n'
+        f'  <Series>{escape(chapter.chapter.name)}</Series>\n'
+        f'  <Number>{chapter.number}</Number>\n'
+        f'  <Title>{escape(chapter.name)}</Title>\n'
+        f'  <PageCount>{page_count}</PageCount>\n'
+        '</ComicInfo>\n'
+    )
+
+
+def _write_stored(archive: zipfile.ZipFile, name: str, source, date_time: Tuple) -> None:
+    """Copy a file object into the archive as a STORED entry, a buffer at a time."""
+    info = zipfile.ZipInfo(name, date_time)
+    info.compress_type = zipfile.ZIP_STORED
+    with archive.open(info, 'w', force_zip64=True) as entry:
+        shutil.copyfileobj(source, entry, COPY_BUFFER_SIZE)
+
+
+def _write_chapter(archive: zipfile.ZipFile, chapter: MangaChapter, storage: Storage,
+                   prefix: str = '', info_name: Optional[str] = 'ComicInfo.xml') -> int:
+    date_time = time.localtime()[:6]
+    pages = list(MangaChapterPage.objects.filter(chapter=chapter).order_by('number'))
+    if info_name:
+        archive.writestr(info_name, comic_info(chapter, len(pages)), zipfile.ZIP_DEFLATED)
+    for page in pages:
+        with storage.open(page.file.name, 'rb') as source:
+            _write_stored(archive, page_entry_name(page, prefix), source, date_time)
+    return len(pages)
+
+
+def build_index(path: str) -> Dict[str, Tuple[int, int]]:
+    """
+    Map every STORED entry of an archive to (data offset, size), so its bytes
+    can be read straight from the file without going through zipfile.
+    """
+    index = {}
+    with zipfile.ZipFile(path) as archive, open(path, 'rb') as f:
+        for info in archive.infolist():
+            if info.compress_type != zipfile.ZIP_STORED or info.is_dir():
+                continue
+            f.seek(info.header_offset)
+            header = LOCAL_HEADER.unpack(f.read(LOCAL_HEADER.size))
+            name_length, extra_length = header[-2:]
+            offset = info.header_offset + LOCAL_HEADER.size + name_length + extra_length
+            index[info.filename] = (offset, info.file_size)
+    return index
+
+
+def index_path(path: str) -> str:
+    return f"{path}.index.json"
+
+
+def write_index(path: str) -> Dict[str, Tuple[int, int]]:
+    """Build the archive's index and save it next to it as <archive>.index.json."""
+    index = build_index(path)
+    temp_path = f"{index_path(path)}.tmp"
+    with open(temp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(temp_path, index_path(path))
+    return index
+
+
+def build_chapter_archive(chapter: MangaChapter, path: str,
+                          storage: Optional[Storage] = None) -> Dict[str, Tuple[int, int]]:
+    """
+    Pack a chapter's pages into a CBZ at path, with its offset index.
+
+    Pages are stored uncompressed (JPEG/WebP/AVIF do not shrink) and
+    streamed from storage. The archive is written to a temporary file and
+    moved into place, so readers never see a half-written one.
+    """
+    storage = storage or page_storage
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.cbz.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as archive:
+            _write_chapter(archive, chapter, storage)
+        os.replace(temp_path, path)
+    except BaseException:
+        os.remove(temp_path)
+        raise
+    return write_index(path)
+
+
+class SeriesArchive:
+    """
+    CBZ holding every chapter of a series, one folder per chapter.
+
+    New chapters are appended in place: zipfile's append mode writes the
+    new entries over the old central directory and a new one at the end, so
+    existing pages are never copied again. The offset index is refreshed
+    after every append.
+
+    Appends hold an exclusive lock on <archive>.lock. Before touching the
+    archive, its central directory is saved to <archive>.recovery; if an
+    append dies half way, the next one (or recover()) truncates the archive
+    back to where the directory was and writes it back.
+    """
+
+    def __init__(self, path: str, storage: Optional[Storage] = None):
+        self.path = path
+        self.storage = storage or page_storage
+
+    @property
+    def recovery_path(self) -> str:
+        return f"{self.path}.recovery"
+
+    def chapter_ids(self) -> set:
+        """Ids of the chapters already in the archive."""
+        if not os.path.exists(self.path):
+            return set()
+        with zipfile.ZipFile(self.path) as archive:
+            matches = (CHAPTER_DIR_PATTERN.match(name) for name in archive.namelist())
+            return {int(match.group(1)) for match in matches if match}
+
+    def _lock(self):
+        handle = open(f"{self.path}.lock", 'a')
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        return handle
+
+    def _save_recovery_point(self):
+        """Copy the central directory aside, with the offset it starts at."""
+        with zipfile.ZipFile(self.path) as archive:
+            start_dir = archive.start_dir
+        temp_path = f"{self.recovery_path}.tmp"
+        with open(self.path, 'rb') as source, open(temp_path, 'wb') as f:
+            source.seek(start_dir)
+            f.write(RECOVERY_HEADER.pack(start_dir))
+            shutil.copyfileobj(source, f, COPY_BUFFER_SIZE)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.recovery_path)
+
+    def _restore(self):
+        """Put the archive back as it was before the interrupted append."""
+        with open(self.recovery_path, 'rb') as saved, open(self.path, 'r+b') as f:
+            start_dir, = RECOVERY_HEADER.unpack(saved.read(RECOVERY_HEADER.size))
+            f.seek(start_dir)
+            f.truncate()
+            shutil.copyfileobj(saved, f, COPY_BUFFER_SIZE)
+            f.flush()
+            os.fsync(f.fileno())
+        os.remove(self.recovery_path)
+        write_index(self.path)
+
+    def recover(self) -> bool:
+        """Undo an append that did not finish, returns whether there was one."""
+        with self._lock():
+            if not os.path.exists(self.recovery_path):
+                return False
+            self._restore()
+            return True
+
+    def append(self, chapters: Iterable[MangaChapter]) -> int:
+        """Add the chapters not in the archive yet, returns how many were added."""
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with self._lock():
+            if os.path.exists(self.recovery_path):
+                self._restore()
+
+            present = self.chapter_ids()
+            missing = [chapter for chapter in chapters if chapter.pk not in present]
+            if not missing:
+                return 0
+
+            if os.path.exists(self.path):
+                self._append_in_place(missing)
+            else:
+                self._create(missing)
+            write_index(self.path)
+        return len(missing)
+
+    def _write_chapters(self, archive: zipfile.ZipFile, chapters: Iterable[MangaChapter]):
+        for chapter in chapters:
+            prefix = chapter_dir(chapter)
+            _write_chapter(archive, chapter, self.storage, prefix, f"{prefix}ComicInfo.xml")
+
+    def _append_in_place(self, chapters: Iterable[MangaChapter]):
+        self._save_recovery_point()
+        try:
+            with open(self.path, 'r+b') as f:
+                with zipfile.ZipFile(f, 'a', zipfile.ZIP_STORED) as archive:
+                    self._write_chapters(archive, chapters)
+                f.flush()
+                os.fsync(f.fileno())
+        except BaseException:
+            self._restore()
+            raise
+        os.remove(self.recovery_path)
+
+    def _create(self, chapters: Iterable[MangaChapter]):
+        # Like build_chapter_archive: readers never see a half-written file
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.path)), suffix='.cbz.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_STORED) as archive:
+                self._write_chapters(archive, chapters)
+            os.replace(temp_path, self.path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+    def sync(self, manga) -> int:
+        """Append every chapter of a Manga that is not in the archive yet."""
+        return self.append(MangaChapter.objects.filter(chapter=manga).order_by('number'))
+
+
+class MappedArchive:
+    """
+    Read-only, memory-mapped view of an archive.
+
+    Entries are located through the offset index (the sidecar when it is
+    up to date, the central directory otherwise), parsed once when the
+    archive is opened. page() then returns a memoryview slice of the
+    mapping: no read call and no copy. prefetch() asks the kernel to read
+    the first pages of the following chapter in the background.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        stat = os.stat(path)
+        self.version = (stat.st_mtime_ns, stat.st_size)
+
+        sidecar = index_path(path)
+        if os.path.exists(sidecar) and os.stat(sidecar).st_mtime_ns >= stat.st_mtime_ns:
+            with open(sidecar) as f:
+                self.index = {name: tuple(location) for name, location in json.load(f).items()}
+        else:
+            self.index = build_index(path)
+        # Pages by (chapter id, page number), chapter None in chapter archives
+        self.pages = {}
+        numbers = {}
+        for name in self.index:
+            match = PAGE_ENTRY_PATTERN.match(name)
+            if match:
+                chapter = int(match.group(2)) if match.group(2) else None
+                self.pages[(chapter, int(match.group(3)))] = name
+                if chapter is not None:
+                    numbers[chapter] = int(match.group(1))
+        # Chapter ids in reading order
+        self.chapters = sorted(numbers, key=lambda chapter: (numbers[chapter], chapter))
+
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def find(self, page_number: int, chapter_id: Optional[int] = None) -> Optional[str]:
+        return self.pages.get((chapter_id, page_number))
+
+    def page(self, name: str) -> memoryview:
+        """Bytes of a stored entry, as a slice of the mapping."""
+        offset, size = self.index[name]
+        return memoryview(self._mmap)[offset:offset + size]
+
+    def next_chapter(self, chapter_id: int) -> Optional[int]:
+        """Id of the chapter after chapter_id, None at the end or if it is not stored."""
+        try:
+            position = self.chapters.index(chapter_id)
+        except ValueError:
+            return None
+        following = self.chapters[position + 1:position + 2]
+        return following[0] if following else None
+
+    def prefetch(self, chapter_id: int, pages: int = READ_AHEAD_PAGES) -> int:
+        """
+        Ask the kernel to read the first pages of a chapter into the page
+        cache without waiting for them. Returns the number of pages asked for.
+        """
+        if not hasattr(mmap, 'MADV_WILLNEED'):
+            return 0
+        names = [self.pages.get((chapter_id, number)) for number in range(1, pages + 1)]
+        locations = [self.index[name] for name in names if name is not None]
+        if not locations:
+            return 0
+        # Pages of a chapter are stored one after the other
+        start = min(offset for offset, _ in locations)
+        end = max(offset + size for offset, size in locations)
+        aligned = start - start % mmap.PAGESIZE
+        try:
+            self._mmap.madvise(mmap.MADV_WILLNEED, aligned, end - aligned)
+        except (OSError, ValueError):
+            # Only a hint: a closed mapping or a refusal loses nothing
+            return 0
+        return len(locations)
+
+    def close(self):
+        try:
+            self._mmap.close()
+        except BufferError:
+            # Slices still held by responses in flight; the mapping is
+            # unmapped when the last of them is released
+            pass
+
+
+class PageFile:
+    """
+    Read-only file object over a page slice of a mapped archive.
+
+    read() hands out memoryview slices of the mapping, so a WSGI server's
+    file_wrapper writes the page to the socket straight from the page
+    cache. Closing it releases the slice.
+    """
+
+    def __init__(self, name: str, content: memoryview):
+        self.name = name
+        self._content = content
+        self._position = 0
+
+    def read(self, size: int = -1) -> memoryview:
+        end = len(self._content)
+        if size is not None and size >= 0:
+            end = min(end, self._position + size)
+        chunk = self._content[self._position:end]
+        self._position = end
+        return chunk
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        base = {os.SEEK_SET: 0, os.SEEK_CUR: self._position, os.SEEK_END: len(self._content)}[whence]
+        self._position = max(0, base + offset)
+        return self._position
+
+    def tell(self) -> int:
+        return self._position
+
+    def close(self):
+        self._content.release()
+
+
+class ArchiveCache:
+    """
+    LRU of open MappedArchives, keyed by path.
+
+    An archive that changed on disk (e.g. a chapter was appended to a series
+    archive) is reopened on its next use. While it cannot be parsed (an
+    append is still writing it) the previously mapped version keeps being
+    served. The least recently used are dropped once more than max_open
+    are mapped. Dropped archives are not closed explicitly: their mapping
+    goes away with the last reference, so pages being served from them
+    stay valid.
+    """
+
+    def __init__(self, max_open: int = 512):
+        self.max_open = max_open
+        self._lock = threading.Lock()
+        self._archives: "OrderedDict[str, MappedArchive]" = OrderedDict()
+
+    def get(self, path: str) -> MappedArchive:
+        stat = os.stat(path)
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            archive = self._archives.get(path)
+            if archive is not None and archive.version == version:
+                self._archives.move_to_end(path)
+                return archive
+
+        # Parse outside the lock, other archives stay available meanwhile
+        try:
+            opened = MappedArchive(path)
+        except (zipfile.BadZipFile, OSError, ValueError):
+            if archive is None:
+                raise
+            # Its entries still lie where they were: appends only add after them
+            return archive
+        with self._lock:
+            self._archives.pop(path, None)
+            self._archives[path] = opened
+            while len(self._archives) > self.max_open:
+                self._archives.popitem(last=False)
+        return opened
+
+    def read_page(self, path: str, page_number: int,
+                  chapter_id: Optional[int] = None) -> Optional[Tuple[str, memoryview]]:
+        """
+        (entry name, bytes) of a page, None if the archive does not have it.
+
+        Opening a chapter of a series archive (serving its first page) reads
+        ahead the first pages of the next chapter.
+        """
+        archive = self.get(path)
+        name = archive.find(page_number, chapter_id)
+        if name is None:
+            return None
+        if page_number == 1 and chapter_id is not None:
+            following = archive.next_chapter(chapter_id)
+            if following is not None:
+                archive.prefetch(following)
+        return name, archive.page(name)
+
+    def clear(self):
+        with self._lock:
+            self._archives.clear()
+
+
+archives = ArchiveCache()
@@ -0,0 +1,357 @@
+import hashlib
+import json
+import mimetypes
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage
+from django.db import transaction
+from requests import HTTPError
+
+from ..models import MangaChapter, MangaChapterPage, StoredFile
+from ..storage import page_storage
+from .extensions.interfaces.manga_source import MangaSource
+from .extensions.interfaces.records import PageRef
+from .transcode import PageTranscoder
+
+
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+
+
+class DownloadError(Exception):
+    """Some pages of a chapter could not be downloaded."""
+
+    def __init__(self, chapter_url: str, failures: dict):
+        self.chapter_url = chapter_url
+        self.failures = failures  # page number -> exception
+        pages = ', '.join(str(number) for number in sorted(failures))
+        super().__init__(f"Failed to download pages {pages} of {chapter_url}")
+
+
+class DownloadStats:
+    """Throughput of one chapter download."""
+
+    __slots__ = ('pages', 'bytes', 'seconds', 'skipped', 'transcoding')
+
+    def __init__(self, pages: int = 0, bytes: int = 0, seconds: float = 0.0, skipped: int = 0,
+                 transcoding: Optional[Future] = None):
+        self.pages = pages
+        self.bytes = bytes
+        self.seconds = seconds
+        self.skipped = skipped  # Pages already stored by an earlier run
+        self.transcoding = transcoding  # Renditions still being made, if any
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.pages / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_second(self) -> float:
+        return self.bytes / 1e6 / self.seconds if self.seconds else 0.0
+
+    def __str__(self):
+        return (f"{self.pages} pages, {self.bytes / 1e6:.1f} MB in {self.seconds:.1f}s "
+                f"({self.pages_per_second:.1f} pages/s, {self.mb_per_second:.2f} MB/s, "
+                f"{self.skipped} already done)")
+
+
+class DownloadCheckpoint:
+    """
+    Pages of a chapter already in storage, persisted as JSON so a restarted
+    worker can pick up where the last one stopped.
+
+    Each finished page records its URL path (host independent, so a new
+    image server does not invalidate it), storage name, size and sha256.
+    The file is rewritten atomically after every page.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.pages: Dict[str, Dict] = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self.pages = {}
+
+    def get(self, page: PageRef) -> Optional[Dict]:
+        """Checkpoint entry of a page, None if it is not done or its URL changed."""
+        with self._lock:
+            entry = self.pages.get(str(page.number))
+        if entry is None or entry['path'] != urlparse(page.url).path:
+            return None
+        return entry
+
+    def mark_done(self, page: PageRef, name: str, size: int, sha256: str):
+        with self._lock:
+            self.pages[str(page.number)] = {
+                'path': urlparse(page.url).path,
+                'name': name,
+                'size': size,
+                'sha256': sha256,
+            }
+            temp_path = f"{self.path}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self.pages, f)
+            os.replace(temp_path, self.path)
+
+    def forget(self, page: PageRef):
+        with self._lock:
+            self.pages.pop(str(page.number), None)
+
+
+class ChapterDownloader:
+    """
+    Downloads the pages of a chapter into MangaChapterPage storage.
+
+    Pages are fetched concurrently through the source's fetch_page(), so
+    every request carries the source's headers and the page Referer and is
+    capped per host by the shared transport. Bodies are streamed in chunks
+    to a partial file in the chapter's work directory and handed to the
+    storage backend from there, and the page rows are created in one bulk
+    insert once every page is stored.
+
+    With a transcoder, the chapter's pages are handed to it once stored and
+    encoded in the background while the next chapter downloads; the
+    returned stats carry the future of their renditions.
+
+    Downloads resume: finished pages are recorded in a checkpoint and not
+    fetched again, and an interrupted page continues from its partial file
+    with a Range request when the host answers 206.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    MAX_WORKERS = 8
+
+    def __init__(self, source: MangaSource, storage: Optional[Storage] = None,
+                 max_workers: int = MAX_WORKERS, chunk_size: int = CHUNK_SIZE,
+                 work_dir: Optional[str] = None, transcoder: Optional[PageTranscoder] = None):
+        """
+        Args:
+            source: Source the chapters come from
+            storage: Storage for page files, defaults to the content-addressed
+                page storage
+            max_workers: Pages downloaded at once
+            chunk_size: Bytes read from the response at a time
+            work_dir: Directory for checkpoints and partial files, defaults
+                to settings.DOWNLOAD_WORK_DIR or a mediadex-downloads temp dir
+            transcoder: Renditions stage to run on every downloaded chapter
+        """
+        self.source = source
+        self.storage = storage or page_storage
+        self.max_workers = max_workers
+        self.chunk_size = chunk_size
+        self.work_dir = work_dir or getattr(
+            settings, 'DOWNLOAD_WORK_DIR', os.path.join(tempfile.gettempdir(), 'mediadex-downloads')
+        )
+        self.transcoder = transcoder
+
+    def page_name(self, chapter: MangaChapter, page: PageRef, content_type: Optional[str] = None) -> str:
+        """
+        Name a page is saved under: manga/<manga id>/<chapter id>/<page number><ext>.
+        Content-addressed storage only keeps the extension.
+        """
+        extension = os.path.splitext(urlparse(page.url).path)[1]
+        if not extension and content_type:
+            extension = mimetypes.guess_extension(content_type.split(';')[0].strip()) or ''
+        # MangaChapter.chapter is the foreign key to its Manga
+        return f"manga/{chapter.chapter_id}/{chapter.pk}/{page.number:04d}{extension}"
+
+    def chapter_work_dir(self, chapter: MangaChapter) -> str:
+        return os.path.join(self.work_dir, str(chapter.chapter_id), str(chapter.pk))
+
+    def _part_path(self, work_dir: str, page: PageRef) -> str:
+        # Named after the URL path so a changed page never resumes stale bytes
+        digest = hashlib.sha1(urlparse(page.url).path.encode()).hexdigest()[:12]
+        return os.path.join(work_dir, f"{page.number:04d}-{digest}.part")
+
+    def _is_stored(self, entry: Optional[Dict]) -> bool:
+        """Whether a checkpointed page is in storage with the size and hash it was saved with."""
+        if entry is None or not self.storage.exists(entry['name']):
+            return False
+        if self.storage.size(entry['name']) != entry['size']:
+            return False
+        sha256 = hashlib.sha256()
+        with self.storage.open(entry['name'], 'rb') as f:
+            for chunk in f.chunks(self.chunk_size):
+                sha256.update(chunk)
+        return sha256.hexdigest() == entry['sha256']
+
+    def _download_part(self, page: PageRef, part_path: str) -> tuple:
+        """
+        Download a page into its partial file, continuing it if the host
+        supports ranges. Returns (bytes fetched, Content-Type).
+        """
+        offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else None
+
+        response = self.source.fetch_page(page, stream=True, headers=headers)
+        transport = self.source.session.transport
+        try:
+            if response.status_code == 416:
+                # The partial file is already complete (or junk): start over
+                response.close()
+                os.remove(part_path)
+                return self._download_part(page, part_path)
+            response.raise_for_status()
+
+            expected = None
+            if response.status_code == 206:
+                match = CONTENT_RANGE_PATTERN.match(response.headers.get('Content-Range', ''))
+                if not match or int(match.group(1)) != offset:
+                    raise HTTPError(f"Unexpected Content-Range for {page.url}", response=response)
+                if match.group(3) != '*':
+                    expected = int(match.group(3))
+                mode = 'ab'
+            else:
+                # The host ignored the range, take the whole body
+                offset = 0
+                mode = 'wb'
+                if 'Content-Length' in response.headers and 'Content-Encoding' not in response.headers:
+                    expected = int(response.headers['Content-Length'])
+
+            fetched = 0
+            with open(part_path, mode) as f:
+                # Keep the host slot while the body is read
+                with transport.host_slot(response.url):
+                    started = time.monotonic()
+                    for chunk in response.iter_content(self.chunk_size):
+                        f.write(chunk)
+                        fetched += len(chunk)
+                    body_seconds = time.monotonic() - started
+            transport.record(response.url, fetched, requests_made=0)
+            # Timed from the request being sent, not from waiting for a slot
+            latency = response.elapsed.total_seconds()
+            self.source.record_page_transfer(page, fetched, latency + body_seconds, latency)
+
+            size = offset + fetched
+            if expected is not None and size != expected:
+                raise IOError(f"Page {page.number} is {size} bytes, expected {expected}")
+            return fetched, response.headers.get('Content-Type')
+        finally:
+            response.close()
+
+    def _store_page(self, chapter: MangaChapter, page: PageRef, work_dir: str,
+                    checkpoint: DownloadCheckpoint) -> tuple:
+        """Download one page to storage, returning (storage name, bytes fetched)."""
+        part_path = self._part_path(work_dir, page)
+        fetched, content_type = self._download_part(page, part_path)
+
+        sha256 = hashlib.sha256()
+        with open(part_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                sha256.update(chunk)
+            size = f.tell()
+            f.seek(0)
+            name = self.storage.save(self.page_name(chapter, page, content_type), File(f))
+
+        checkpoint.mark_done(page, name, size, sha256.hexdigest())
+        os.remove(part_path)
+        return name, fetched
+
+    def _store_pages(self, chapter: MangaChapter, pages: List[PageRef], work_dir: str,
+                     checkpoint: DownloadCheckpoint) -> tuple:
+        """Store pages concurrently, returning ({number: (name, bytes)}, {number: exception})."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                page.number: executor.submit(self._store_page, chapter, page, work_dir, checkpoint)
+                for page in pages
+            }
+
+        stored = {}
+        failures = {}
+        for number, future in futures.items():
+            try:
+                stored[number] = future.result()
+            except Exception as e:
+                failures[number] = e
+        return stored, failures
+
+    def download(self, chapter: MangaChapter, chapter_url: str,
+                 pages: Optional[List[PageRef]] = None) -> DownloadStats:
+        """
+        Download every page of a chapter and create its MangaChapterPage rows.
+
+        Args:
+            chapter: Chapter row the pages belong to
+            chapter_url: Chapter URL on the source
+            pages: Pages to download, defaults to source.get_pages(chapter_url)
+
+        Raises:
+            DownloadError: if any page failed; finished pages stay in the
+                checkpoint and partial ones on disk for the next attempt
+        """
+        started = time.monotonic()
+        if pages is None:
+            pages = self.source.get_pages(chapter_url)
+
+        work_dir = self.chapter_work_dir(chapter)
+        os.makedirs(work_dir, exist_ok=True)
+        checkpoint = DownloadCheckpoint(os.path.join(work_dir, 'checkpoint.json'))
+
+        # Pages stored by an earlier run are not fetched again
+        done = {}
+        missing = []
+        for page in pages:
+            entry = checkpoint.get(page)
+            if self._is_stored(entry):
+                done[page.number] = (entry['name'], 0)
+            else:
+                checkpoint.forget(page)
+                missing.append(page)
+
+        stored, failures = self._store_pages(chapter, missing, work_dir, checkpoint)
+
+        # Expired image URLs (e.g. a MangaDex@Home token) come back as 403:
+        # get fresh URLs once and retry those pages
+        expired = [number for number, e in failures.items()
+                   if isinstance(e, HTTPError) and e.response is not None and e.response.status_code == 403]
+        if expired:
+            refreshed = {page.number: page for page in self.source.refresh_pages(chapter_url)}
+            retried, still_failing = self._store_pages(
+                chapter, [refreshed[number] for number in expired if number in refreshed],
+                work_dir, checkpoint
+            )
+            stored.update(retried)
+            for number in retried:
+                del failures[number]
+            failures.update(still_failing)
+
+        if failures:
+            raise DownloadError(chapter_url, failures)
+
+        fetched = sum(size for _, size in stored.values())
+        stored.update(done)
+        with transaction.atomic():
+            # Lock the chapter so concurrent runs do not both insert, and skip
+            # pages a run that died before clearing its checkpoint already added
+            MangaChapter.objects.select_for_update().get(pk=chapter.pk)
+            existing = set(MangaChapterPage.objects.filter(chapter=chapter).values_list('number', flat=True))
+            new = sorted((number, name) for number, (name, _) in stored.items() if number not in existing)
+            MangaChapterPage.objects.bulk_create([
+                MangaChapterPage(number=number, file=name, chapter=chapter)
+                for number, name in new
+            ])
+            StoredFile.add_references(name for _, name in new)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+        transcoding = None
+        if self.transcoder is not None:
+            transcoding = self.transcoder.submit(MangaChapterPage.objects.filter(chapter=chapter))
+
+        return DownloadStats(
+            pages=len(stored) - len(done),
+            bytes=fetched,
+            seconds=time.monotonic() - started,
+            skipped=len(done),
+            transcoding=transcoding
+        )
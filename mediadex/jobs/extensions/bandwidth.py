@@ -0,0 +1,98 @@
+import threading
+from typing import Dict, Optional
+
+
+class BandwidthEstimator:
+    """
+    Moving averages of request latency, download throughput and page size
+    per quality.
+
+    Fed with every page transfer, it predicts how long a page of each
+    quality would take as latency plus size over throughput, and picks the
+    best quality that arrives within a target time. Throughput is measured
+    on the body alone, so small data-saver pages, whose time is mostly
+    latency, do not drag down the prediction for full pages. Until pages
+    of a quality have been seen, its size is taken from DEFAULT_PAGE_SIZES.
+    """
+
+    FULL = 'data'
+    SAVER = 'data-saver'
+    DEFAULT_PAGE_SIZES = {
+        FULL: 1_500_000,
+        SAVER: 250_000,
+    }
+
+    def __init__(self, alpha: float = 0.2, page_sizes: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            alpha: Weight of the newest sample in the moving averages
+            page_sizes: Initial page size guesses per quality, in bytes
+        """
+        self.alpha = alpha
+        self._lock = threading.Lock()
+        self._throughput: Optional[float] = None  # bytes per second
+        self._latency: Optional[float] = None  # seconds until the response headers arrive
+        self._page_sizes = dict(self.DEFAULT_PAGE_SIZES)
+        self._page_sizes.update(page_sizes or {})
+        self._seen = set()
+
+    def _average(self, current: Optional[float], sample: float) -> float:
+        return sample if current is None else current + self.alpha * (sample - current)
+
+    def record(self, size: int, seconds: float, quality: Optional[str] = None,
+               latency: Optional[float] = None):
+        """
+        Add one finished page transfer.
+
+        Args:
+            size: Bytes received
+            seconds: Time from sending the request to the last byte, not
+                counting waits for a host slot or the throttle
+            quality: Quality of the page, to learn its typical size
+            latency: Part of seconds spent until the response headers
+                arrived; the current estimate is assumed when not given
+        """
+        if size <= 0 or seconds <= 0:
+            return
+        with self._lock:
+            if latency is None:
+                latency = self._latency or 0.0
+            else:
+                latency = min(latency, seconds)
+                self._latency = self._average(self._latency, latency)
+            body_seconds = seconds - latency
+            if body_seconds > 0:
+                self._throughput = self._average(self._throughput, size / body_seconds)
+
+            if quality in self._page_sizes:
+                if quality not in self._seen:
+                    self._page_sizes[quality] = size
+                    self._seen.add(quality)
+                else:
+                    self._page_sizes[quality] += self.alpha * (size - self._page_sizes[quality])
+
+    @property
+    def throughput(self) -> Optional[float]:
+        """Estimated body bytes per second, None before the first transfer."""
+        with self._lock:
+            return self._throughput
+
+    @property
+    def latency(self) -> Optional[float]:
+        """Estimated seconds until a response's headers arrive, None before the first measurement."""
+        with self._lock:
+            return self._latency
+
+    def page_time(self, quality: str) -> Optional[float]:
+        """Predicted seconds to download one page of the quality."""
+        with self._lock:
+            if not self._throughput:
+                return None
+            return (self._latency or 0.0) + self._page_sizes[quality] / self._throughput
+
+    def choose(self, target_seconds: float) -> str:
+        """Full quality if a page is predicted to arrive within target_seconds, else data-saver."""
+        predicted = self.page_time(self.FULL)
+        if predicted is None or predicted <= target_seconds:
+            return self.FULL
+        return self.SAVER
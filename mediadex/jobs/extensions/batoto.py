@@ -1,6 +1,7 @@
-import requests
 from bs4 import BeautifulSoup
 from .interfaces.manga_source import MangaSource
+from .transport import Transport, TransportSession, get_transport
+from .interfaces.records import Chapter, Manga, PageRef, parse_chapter_number, parse_timestamp
 from urllib.parse import urlencode
 import sys
 import os
@@ -17,8 +18,8 @@ class BatoToSource(MangaSource):
     
     BASE_URL = "https://batotwo.com"
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, transport: Transport = None):
+        self.session = TransportSession(transport or get_transport())
         # Set simple headers to avoid bot detection
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
@@ -34,6 +35,12 @@ class BatoToSource(MangaSource):
         Search for manga on BatoTo.
         Supports both text search and ID-based lookup.
         """
+        return list(self.iter_search(query))
+
+    def iter_search(self, query: str):
+        """
+        Yield search results as they are parsed from the results page.
+        """
         if query.startswith("ID:"):
             # Direct ID lookup
             manga_id = query[3:].strip()
@@ -47,11 +54,12 @@ class BatoToSource(MangaSource):
                 # Extract manga title from the page
                 title_element = soup.select_one("div#mainer div.container-fluid h3")
                 title = title_element.text.strip() if title_element else f"Manga {manga_id}"
-                
-                return [{"title": title, "url": url}]
             except Exception as e:
                 print(f"Error fetching manga ID {manga_id}: {e}")
-                return []
+                return
+            
+            yield Manga(title=title, url=url)
+            return
 
         # Text search
         params = {"word": query, "page": "1"}
@@ -61,7 +69,6 @@ class BatoToSource(MangaSource):
             response = self.session.get(search_url)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, "html.parser")
-            results = []
 
             # Updated selector based on actual BatoTo structure
             for item in soup.select("div#series-list div.col"):
@@ -84,28 +91,26 @@ class BatoToSource(MangaSource):
                             if thumbnail and not thumbnail.startswith("http"):
                                 thumbnail = self.BASE_URL + thumbnail
                         
-                        result = {"title": title, "url": href}
-                        if thumbnail:
-                            result["thumbnail"] = thumbnail
-                        
-                        results.append(result)
-
-            return results
+                        yield Manga(title=title, url=href, cover_url=thumbnail)
             
         except Exception as e:
             print(f"Error searching for '{query}': {e}")
-            return []
 
     def get_chapters(self, manga_url: str) -> list:
         """
         Get list of chapters for a manga.
         Returns chapters with title, URL, and metadata.
         """
+        return list(self.iter_chapters(manga_url))
+
+    def iter_chapters(self, manga_url: str):
+        """
+        Yield the chapters of a manga as each row is parsed.
+        """
         try:
             response = self.session.get(manga_url)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, "html.parser")
-            chapters = []
             
             # Check if chapter list is available
             warning_element = soup.select_one(".episode-list > .alert-warning")
@@ -126,33 +131,41 @@ class BatoToSource(MangaSource):
                         href = self.BASE_URL + href
                     
                     # Extract additional metadata
-                    chapter_data = {"title": title, "url": href}
+                    chapter = Chapter(title=title, url=href, chapter_number=parse_chapter_number(title))
                     
                     # Get scanlator/group info
                     group_element = row.select_one("div.extra > a:not(.ps-3)")
                     user_element = row.select_one("div.extra > a.ps-3")
                     
                     if group_element:
-                        chapter_data["scanlator"] = group_element.text.strip()
+                        chapter.scanlator = group_element.text.strip()
                     elif user_element:
-                        chapter_data["scanlator"] = user_element.text.strip()
+                        chapter.scanlator = user_element.text.strip()
                     else:
-                        chapter_data["scanlator"] = "Unknown"
+                        chapter.scanlator = "Unknown"
                     
-                    # Get upload time
+                    # Get upload time ("3 days ago")
                     time_element = row.select_one("div.extra > i.ps-3")
                     if time_element:
-                        chapter_data["upload_time"] = time_element.text.strip()
+                        chapter.upload_time = time_element.text.strip()
+                        chapter.published_at = parse_timestamp(chapter.upload_time)
                     
-                    chapters.append(chapter_data)
-            
-            return chapters
+                    yield chapter
             
         except Exception as e:
             print(f"Error getting chapters for '{manga_url}': {e}")
-            return []
 
     def get_pages(self, chapter_url: str) -> list:
+        """
+        Get list of pages for a chapter.
+        Returns PageRef records carrying the Referer the image host expects.
+        """
+        return [
+            PageRef(url, i + 1, f"{self.BASE_URL}/")
+            for i, url in enumerate(self._get_page_urls(chapter_url))
+        ]
+
+    def _get_page_urls(self, chapter_url: str) -> list:
         """
         Get list of page URLs for a chapter.
         Handles encrypted image URLs using crypto decryption.
@@ -212,9 +225,9 @@ class BatoToSource(MangaSource):
             print(f"Error getting pages for '{chapter_url}': {e}")
             return []
 
-    def get_manga_details(self, manga_url: str) -> dict:
+    def get_manga_details(self, manga_url: str):
         """
-        Get detailed information about a manga.
+        Get detailed information about a manga, or {} when nothing was found.
         This is an additional method not in the base interface.
         """
         try:
@@ -226,12 +239,12 @@ class BatoToSource(MangaSource):
             if not info_element:
                 return {}
             
-            details = {}
+            details = Manga(title=None, url=manga_url)
             
             # Title
             title_element = info_element.select_one("h3")
             if title_element:
-                details["title"] = title_element.text.strip()
+                details.title = title_element.text.strip()
             
             # Thumbnail
             thumbnail_element = soup.select_one("div.attr-cover img")
@@ -239,16 +252,16 @@ class BatoToSource(MangaSource):
                 thumbnail = thumbnail_element.get("src")
                 if thumbnail and not thumbnail.startswith("http"):
                     thumbnail = self.BASE_URL + thumbnail
-                details["thumbnail"] = thumbnail
+                details.cover_url = thumbnail
             
             # Author and Artist
             author_element = info_element.select_one("div.attr-item:contains(author) span")
             if author_element:
-                details["author"] = author_element.text.strip()
+                details.author = author_element.text.strip()
             
             artist_element = info_element.select_one("div.attr-item:contains(artist) span")
             if artist_element:
-                details["artist"] = artist_element.text.strip()
+                details.artist = artist_element.text.strip()
             
             # Status
             work_status_element = info_element.select_one("div.attr-item:contains(original work) span")
@@ -256,18 +269,18 @@ class BatoToSource(MangaSource):
             
             if work_status_element or upload_status_element:
                 status = (work_status_element or upload_status_element).text.strip()
-                details["status"] = status
+                details.status = status
             
             # Genres
             genre_elements = info_element.select(".attr-item b:contains(genres) + span")
             if genre_elements:
                 genres = [elem.text.strip() for elem in genre_elements]
-                details["genres"] = genres
+                details.tags = genres
             
             # Description
             description_element = info_element.select_one("div.limit-html")
             if description_element:
-                details["description"] = description_element.text.strip()
+                details.description = description_element.text.strip()
             
             return details
             
@@ -281,33 +294,13 @@ class BatoToSource(MangaSource):
         Returns None if no next chapter exists.
         """
         try:
-            # If manga_url is not provided, try to extract it from chapter URL
-            if not manga_url:
-                manga_url = self._extract_manga_url_from_chapter(current_chapter_url)
-                if not manga_url:
-                    return None
-            
-            # Get all chapters for the manga
-            chapters = self.get_chapters(manga_url)
-            if not chapters:
+            index = self._find_chapter_index(current_chapter_url, manga_url)
+            if not index:
                 return None
             
-            # Find current chapter index
-            current_index = None
-            for i, chapter in enumerate(chapters):
-                if chapter["url"] == current_chapter_url:
-                    current_index = i
-                    break
-            
-            if current_index is None:
-                return None
-            
-            # Return next chapter (chapters are usually ordered newest first)
-            # So next chapter is at index - 1
-            if current_index > 0:
-                return chapters[current_index - 1]["url"]
-            
-            return None
+            # Chapters are usually ordered newest first,
+            # so next chapter is at index - 1
+            return index.next(current_chapter_url)
             
         except Exception as e:
             print(f"Error getting next chapter for '{current_chapter_url}': {e}")
@@ -319,38 +312,22 @@ class BatoToSource(MangaSource):
         Returns None if no previous chapter exists.
         """
         try:
-            # If manga_url is not provided, try to extract it from chapter URL
-            if not manga_url:
-                manga_url = self._extract_manga_url_from_chapter(current_chapter_url)
-                if not manga_url:
-                    return None
-            
-            # Get all chapters for the manga
-            chapters = self.get_chapters(manga_url)
-            if not chapters:
+            index = self._find_chapter_index(current_chapter_url, manga_url)
+            if not index:
                 return None
             
-            # Find current chapter index
-            current_index = None
-            for i, chapter in enumerate(chapters):
-                if chapter["url"] == current_chapter_url:
-                    current_index = i
-                    break
-            
-            if current_index is None:
-                return None
-            
-            # Return previous chapter (chapters are usually ordered newest first)
-            # So previous chapter is at index + 1
-            if current_index < len(chapters) - 1:
-                return chapters[current_index + 1]["url"]
-            
-            return None
+            # Chapters are usually ordered newest first,
+            # so previous chapter is at index + 1
+            return index.previous(current_chapter_url)
             
         except Exception as e:
             print(f"Error getting previous chapter for '{current_chapter_url}': {e}")
             return None
 
+    def _resolve_manga_url(self, chapter_url: str) -> str:
+        """Find the series URL from the chapter page."""
+        return self._extract_manga_url_from_chapter(chapter_url)
+
     def get_chapter_navigation_from_page(self, chapter_url: str) -> dict:
         """
         Extract chapter navigation directly from the chapter page.
@@ -3,12 +3,14 @@ from bs4 import BeautifulSoup
 from urllib.parse import urlencode, quote_plus, urljoin
 from datetime import datetime
 from .interfaces.manga_source import MangaSource
+from .transport import Transport, TransportSession, get_transport
+from .interfaces.records import Chapter, Manga, PageRef, parse_chapter_number
 
 class MangaDemonSource(MangaSource):
     BASE_URL = "https://demonicscans.org"
     
-    def __init__(self):
-        self.session = requests.Session()
+    def __init__(self, transport: Transport = None):
+        self.session = TransportSession(transport or get_transport())
         self.session.headers.update({
             'Referer': f'{self.BASE_URL}/',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -34,11 +36,11 @@ class MangaDemonSource(MangaSource):
             thumbnail_element = element.select_one('img')
             
             if manga_link and title_element:
-                results.append({
-                    "title": title_element.get_text(strip=True),
-                    "url": self._make_absolute_url(manga_link.get('href')),
-                    "thumbnail_url": self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None
-                })
+                results.append(Manga(
+                    title=title_element.get_text(strip=True),
+                    url=self._make_absolute_url(manga_link.get('href')),
+                    cover_url=self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None
+                ))
         return results
 
     def get_latest_updates(self, page=1):
@@ -56,36 +58,38 @@ class MangaDemonSource(MangaSource):
             if info_div:
                 manga_link = info_div.select_one('a')
                 if manga_link:
-                    results.append({
-                        "title": manga_link.get_text(strip=True),
-                        "url": self._make_absolute_url(manga_link.get('href')),
-                        "thumbnail_url": self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None
-                    })
+                    results.append(Manga(
+                        title=manga_link.get_text(strip=True),
+                        url=self._make_absolute_url(manga_link.get('href')),
+                        cover_url=self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None
+                    ))
         return results
 
     def search(self, query):
         """Search manga - equivalent to searchMangaRequest in Kotlin"""
+        return list(self.iter_search(query))
+
+    def iter_search(self, query):
+        """Yield search results as they are parsed"""
         if not query.strip():
-            return []
+            return
             
         url = f"{self.BASE_URL}/search.php"
         params = {'manga': query}
         response = self.session.get(url, params=params)
         soup = BeautifulSoup(response.text, "html.parser")
         
-        results = []
         # Updated selector based on actual HTML structure
         for element in soup.select('a[href*="/manga/"]'):
             title_element = element.select_one('div.seach-right > div')
             thumbnail_element = element.select_one('img')
             
             if title_element:
-                results.append({
-                    "title": title_element.get_text(strip=True),
-                    "url": self._make_absolute_url(element.get('href')),
-                    "thumbnail_url": self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None
-                })
-        return results
+                yield Manga(
+                    title=title_element.get_text(strip=True),
+                    url=self._make_absolute_url(element.get('href')),
+                    cover_url=self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None
+                )
 
     def get_manga_details(self, manga_url):
         """Get manga details - equivalent to mangaDetailsParse in Kotlin"""
@@ -124,22 +128,26 @@ class MangaDemonSource(MangaSource):
         
         status = self._parse_status(status_text)
         
-        return {
-            "title": title_element.get_text(strip=True) if title_element else None,
-            "thumbnail_url": self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None,
-            "description": description_element.get_text(strip=True) if description_element else None,
-            "genres": genres,
-            "author": author,
-            "status": status
-        }
+        return Manga(
+            title=title_element.get_text(strip=True) if title_element else None,
+            url=absolute_url,
+            cover_url=self._make_absolute_url(thumbnail_element.get('src')) if thumbnail_element else None,
+            description=description_element.get_text(strip=True) if description_element else None,
+            tags=genres,
+            author=author,
+            status=status
+        )
 
     def get_chapters(self, manga_url):
         """Get chapter list - equivalent to chapterFromElement in Kotlin"""
+        return list(self.iter_chapters(manga_url))
+
+    def iter_chapters(self, manga_url):
+        """Yield chapters as they are parsed"""
         absolute_url = self._make_absolute_url(manga_url)
         response = self.session.get(absolute_url)
         soup = BeautifulSoup(response.text, "html.parser")
         
-        chapters = []
         # Selector from Kotlin: "div#chapters-list a.chplinks"
         for element in soup.select('div#chapters-list a.chplinks'):
             title = element.get_text(strip=True)
@@ -151,12 +159,12 @@ class MangaDemonSource(MangaSource):
             upload_date = self._parse_date(date_text)
             
             if title and href:
-                chapters.append({
-                    "title": title,
-                    "url": self._make_absolute_url(href),
-                    "date_upload": upload_date
-                })
-        return chapters
+                yield Chapter(
+                    title=title,
+                    url=self._make_absolute_url(href),
+                    chapter_number=parse_chapter_number(title),
+                    published_at=upload_date
+                )
 
     def get_pages(self, chapter_url):
         """Get page images - equivalent to pageListParse in Kotlin"""
@@ -169,7 +177,7 @@ class MangaDemonSource(MangaSource):
         for img in soup.select('div > img.imgholder'):
             src = img.get('src')
             if src:
-                pages.append(self._make_absolute_url(src))
+                pages.append(PageRef(self._make_absolute_url(src), len(pages) + 1, f'{self.BASE_URL}/'))
         return pages
 
     def _parse_status(self, status_text):
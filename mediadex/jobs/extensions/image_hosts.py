@@ -0,0 +1,199 @@
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+
+
+def _succeeded(future) -> bool:
+    return future.exception() is None and future.result().status_code < 500
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+class HostStats:
+    """Exponentially weighted latency and error rate of one image host."""
+
+    __slots__ = ('latency', 'error_rate', 'samples', 'flagged_at')
+
+    def __init__(self):
+        self.latency = 0.0
+        self.error_rate = 0.0
+        self.samples = 0
+        # When the host last crossed a limit, None while it is within them
+        self.flagged_at: Optional[float] = None
+
+    def to_dict(self) -> Dict:
+        return {'latency': self.latency, 'error_rate': self.error_rate, 'samples': self.samples}
+
+
+class ImageHostSelector:
+    """
+    Picks the image host for page URLs from measured behaviour.
+
+    Every page fetch records its latency and outcome against the host that
+    served it. A host whose average latency or error rate crosses the limits
+    is avoided in favour of the fallback host until the probation period has
+    passed since it crossed them, after which it gets another chance.
+
+    fetch() can also hedge: if the chosen host has not answered after
+    hedge_after seconds, the same page is requested from the fallback host
+    and whichever answers first is used.
+    """
+
+    def __init__(self, fallback: str, path_start: str = r'/',
+                 alpha: float = 0.3, max_latency: float = 5.0,
+                 max_error_rate: float = 0.3, min_samples: int = 3,
+                 probation: float = 60.0, clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            fallback: Base URL (scheme and host) of the canonical image host
+            path_start: Regex marking where the host independent part of a
+                page URL starts, everything before it is replaced on fallback
+            alpha: Weight of the newest sample in the moving averages
+            max_latency: Average seconds above which a host is avoided
+            max_error_rate: Average error rate above which a host is avoided
+            min_samples: Samples needed before a host can be judged
+            probation: Seconds an avoided host is left alone before retrying it
+            clock: Time source, injectable for tests
+        """
+        self.fallback = fallback.rstrip('/')
+        self.path_start = re.compile(path_start)
+        self.alpha = alpha
+        self.max_latency = max_latency
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.probation = probation
+        self.clock = clock
+
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, HostStats] = {}
+        self._executor = None
+
+    @staticmethod
+    def host_of(url: str) -> str:
+        parsed = urlparse(url)
+        return f"{parsed.scheme}://{parsed.netloc}"
+
+    def record(self, url: str, latency: float, ok: bool):
+        """Add one fetch outcome to its host's averages."""
+        with self._lock:
+            stats = self._hosts.setdefault(self.host_of(url), HostStats())
+            if stats.samples == 0:
+                stats.latency = latency
+                stats.error_rate = 0.0 if ok else 1.0
+            else:
+                stats.latency += self.alpha * (latency - stats.latency)
+                stats.error_rate += self.alpha * ((0.0 if ok else 1.0) - stats.error_rate)
+            stats.samples += 1
+            if self._is_bad(stats):
+                if stats.flagged_at is None:
+                    stats.flagged_at = self.clock()
+            else:
+                stats.flagged_at = None
+
+    def _is_bad(self, stats: HostStats) -> bool:
+        return stats.samples >= self.min_samples and (
+            stats.error_rate > self.max_error_rate or stats.latency > self.max_latency)
+
+    def is_healthy(self, url: str) -> bool:
+        host = self.host_of(url)
+        if host == self.fallback:
+            return True
+        with self._lock:
+            stats = self._hosts.get(host)
+            if stats is None or stats.flagged_at is None:
+                return True
+            if self.clock() - stats.flagged_at >= self.probation:
+                # Give it another chance, judged on fresh samples
+                self._hosts[host] = HostStats()
+                return True
+            return False
+
+    def rebase(self, url: str, base_url: str) -> str:
+        """The same page under another base URL."""
+        path = url[len(self.host_of(url)):]
+        match = self.path_start.search(path)
+        return base_url.rstrip('/') + (path[match.start():] if match else path)
+
+    def fallback_url(self, url: str) -> str:
+        """The same page on the fallback host."""
+        return self.rebase(url, self.fallback)
+
+    def choose(self, base_url: str) -> str:
+        """Base URL to build page URLs on: the given one, or the fallback if it is unhealthy."""
+        return base_url if self.is_healthy(base_url) else self.fallback
+
+    def stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {host: stats.to_dict() for host, stats in self._hosts.items()}
+
+    def _timed_get(self, url: str, get: Callable[[str], requests.Response]) -> requests.Response:
+        started = self.clock()
+        try:
+            response = get(url)
+        except requests.RequestException:
+            self.record(url, self.clock() - started, ok=False)
+            raise
+        # 4xx means a bad or expired URL, not a bad host
+        self.record(url, self.clock() - started, ok=response.status_code < 500)
+        return response
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix='image-hedge')
+            return self._executor
+
+    def fetch(self, url: str, get: Callable[[str], requests.Response],
+              hedge_after: Optional[float] = None) -> requests.Response:
+        """
+        Fetch a page image with get(url), avoiding unhealthy hosts, failing
+        over to the fallback host on errors and optionally hedging.
+        """
+        if not self.is_healthy(url):
+            url = self.fallback_url(url)
+        fallback = self.fallback_url(url)
+        if url == fallback:
+            return self._timed_get(url, get)
+
+        if not hedge_after:
+            try:
+                response = self._timed_get(url, get)
+            except requests.RequestException:
+                return self._timed_get(fallback, get)
+            if response.status_code < 500:
+                return response
+            response.close()
+            return self._timed_get(fallback, get)
+
+        executor = self._get_executor()
+        primary = executor.submit(self._timed_get, url, get)
+        done, _ = wait([primary], timeout=hedge_after)
+        if primary in done and _succeeded(primary):
+            return primary.result()
+
+        # Slow or failed: race (or replace) it with the fallback host
+        pending = {primary, executor.submit(self._timed_get, fallback, get)} - done
+        failed = list(done)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if _succeeded(future):
+                    # Release every other response, the pending one once it answers
+                    for loser in failed + list(pending) + [other for other in done if other is not future]:
+                        loser.add_done_callback(_close_response)
+                    return future.result()
+                failed.append(future)
+
+        # Both failed: surface the last outcome, release the other response
+        last = failed.pop()
+        for future in failed:
+            _close_response(future)
+        return last.result()
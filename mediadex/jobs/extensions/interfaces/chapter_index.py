@@ -0,0 +1,115 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+class ChapterIndex:
+    """
+    Chapter URLs of one manga in source order (newest first), with a
+    URL -> position dict for constant time neighbour lookups.
+    """
+
+    def __init__(self, manga_url: str, urls: List[str]):
+        self.manga_url = manga_url
+        self.urls = urls
+        self.positions = {url: i for i, url in enumerate(urls)}
+        self.created_at = time.time()
+
+    def is_stale(self, ttl: float) -> bool:
+        return time.time() - self.created_at >= ttl
+
+    def __contains__(self, url: str) -> bool:
+        return url in self.positions
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def neighbour(self, url: str, step: int) -> Optional[str]:
+        """Get the URL step positions away from url, None past either end."""
+        position = self.positions.get(url)
+        if position is None:
+            return None
+
+        target = position + step
+        if 0 <= target < len(self.urls):
+            return self.urls[target]
+        return None
+
+    def next(self, url: str) -> Optional[str]:
+        """Next chapter, one position towards the newest."""
+        return self.neighbour(url, -1)
+
+    def previous(self, url: str) -> Optional[str]:
+        """Previous chapter, one position towards the oldest."""
+        return self.neighbour(url, 1)
+
+
+class ChapterIndexCache:
+    """
+    Chapter indexes keyed by manga, plus the chapter -> manga map filled in as
+    indexes are built. Shared by every source instance in the process.
+
+    Holds at most max_indexes indexes; the least recently used is dropped
+    along with its chapters' entries in the chapter -> manga map.
+    """
+
+    def __init__(self, max_indexes: int = 2000):
+        self.max_indexes = max_indexes
+        self._lock = threading.Lock()
+        self._indexes: "OrderedDict[tuple, ChapterIndex]" = OrderedDict()
+        self._manga_by_chapter: Dict[tuple, str] = {}
+
+    def get(self, namespace: tuple, manga_url: str, loader: Callable[[], List[str]],
+            ttl: float) -> ChapterIndex:
+        """
+        Get the index for a manga, calling loader for its chapter URLs when
+        the index is missing or older than ttl.
+
+        Args:
+            namespace: Separates sources and languages, e.g. ('MangaDexSource', 'en')
+            manga_url: Manga URL the chapters belong to
+            loader: Returns the chapter URLs in source order
+            ttl: Maximum index age in seconds
+        """
+        key = namespace + (manga_url,)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is not None:
+                self._indexes.move_to_end(key)
+        if index is not None and not index.is_stale(ttl):
+            return index
+
+        index = ChapterIndex(manga_url, loader())
+
+        with self._lock:
+            self._forget(key)
+            self._indexes[key] = index
+            for url in index.urls:
+                self._manga_by_chapter[namespace + (url,)] = manga_url
+            while len(self._indexes) > self.max_indexes:
+                self._forget(next(iter(self._indexes)))
+        return index
+
+    def _forget(self, key: tuple):
+        """Drop an index and its chapters from the chapter -> manga map, lock held."""
+        index = self._indexes.pop(key, None)
+        if index is None:
+            return
+        namespace = key[:-1]
+        for url in index.urls:
+            chapter_key = namespace + (url,)
+            if self._manga_by_chapter.get(chapter_key) == index.manga_url:
+                del self._manga_by_chapter[chapter_key]
+
+    def manga_for(self, namespace: tuple, chapter_url: str) -> Optional[str]:
+        """Get the manga URL a chapter was last indexed under."""
+        with self._lock:
+            return self._manga_by_chapter.get(namespace + (chapter_url,))
+
+    def invalidate(self, namespace: tuple, manga_url: str):
+        with self._lock:
+            self._indexes.pop(namespace + (manga_url,), None)
+
+
+chapter_indexes = ChapterIndexCache()
@@ -0,0 +1,225 @@
+import math
+from array import array
+from bisect import bisect_left, bisect_right
+from itertools import compress
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .records import Chapter
+
+
+NAN = float('nan')
+
+
+def _number(value) -> float:
+    """Column value for an optional number, NaN when missing or unparseable."""
+    if value is None or value == '':
+        return NAN
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+
+class ChapterTable:
+    """
+    Columnar chapter list for bulk work on long series.
+
+    Numbers, volumes, publish and update timestamps and page counts live
+    in typed arrays (NaN / 0 when unknown). Scanlators are interned and
+    stored as ids, URLs, titles and chapter IDs are kept once per row.
+    Operations return new tables or row positions instead of materialising
+    Chapter records; use row() or to_chapters() when records are needed.
+
+    Nothing is vectorised: filters, sort() and best_per_chapter() still
+    visit every row in Python (comprehensions, compress, key functions),
+    the columns only save memory and per-record attribute lookups. The
+    by-number order is computed once and cached, so range() and
+    neighbours() are binary searches.
+    """
+
+    def __init__(self):
+        self.numbers = array('d')
+        self.volumes = array('d')
+        self.published = array('d')
+        self.updated = array('d')
+        self.pages = array('l')
+        self.scanlator_ids = array('l')
+        self.urls: List[str] = []
+        self.titles: List[str] = []
+        self.chapter_ids: List[Optional[str]] = []
+        self.scanlators: List[str] = []
+        self._scanlator_ids: Dict[str, int] = {}
+        self._positions: Optional[Dict[str, int]] = None
+        # Positions with a chapter number sorted by it, and those numbers
+        self._by_number: Optional[Tuple[List[int], array]] = None
+
+    @classmethod
+    def from_chapters(cls, chapters: Iterable[Chapter]) -> 'ChapterTable':
+        table = cls()
+        for chapter in chapters:
+            table.append(chapter)
+        return table
+
+    def __len__(self) -> int:
+        return len(self.urls)
+
+    def _intern_scanlator(self, name: Optional[str]) -> int:
+        name = name or "Unknown"
+        scanlator_id = self._scanlator_ids.get(name)
+        if scanlator_id is None:
+            scanlator_id = len(self.scanlators)
+            self.scanlators.append(name)
+            self._scanlator_ids[name] = scanlator_id
+        return scanlator_id
+
+    def append(self, chapter: Chapter):
+        self.numbers.append(_number(chapter.chapter_number))
+        self.volumes.append(_number(chapter.volume))
+        self.published.append(_number(chapter.published_at))
+        self.updated.append(_number(chapter.updated_at))
+        self.pages.append(chapter.pages or 0)
+        self.scanlator_ids.append(self._intern_scanlator(chapter.scanlator))
+        self.urls.append(chapter.url)
+        self.titles.append(chapter.title)
+        self.chapter_ids.append(chapter.chapter_id)
+        self._positions = None
+        self._by_number = None
+
+    def row(self, position: int) -> Chapter:
+        """Materialise one row as a Chapter record."""
+        number = self.numbers[position]
+        volume = self.volumes[position]
+        published = self.published[position]
+        updated = self.updated[position]
+        return Chapter(
+            title=self.titles[position],
+            url=self.urls[position],
+            chapter_number=None if math.isnan(number) else number,
+            volume=None if math.isnan(volume) else f"{volume:g}",
+            scanlator=self.scanlators[self.scanlator_ids[position]],
+            published_at=None if math.isnan(published) else published,
+            updated_at=None if math.isnan(updated) else updated,
+            pages=self.pages[position],
+            chapter_id=self.chapter_ids[position]
+        )
+
+    def to_chapters(self) -> List[Chapter]:
+        return [self.row(position) for position in range(len(self))]
+
+    def position(self, url: str) -> Optional[int]:
+        """Row position of a chapter URL."""
+        if self._positions is None:
+            self._positions = {url: i for i, url in enumerate(self.urls)}
+        return self._positions.get(url)
+
+    def _known(self, column: array) -> List[int]:
+        """Positions where a numeric column is not NaN."""
+        return list(compress(range(len(self)), [not math.isnan(value) for value in column]))
+
+    def by_number(self) -> Tuple[List[int], array]:
+        """
+        Positions that have a chapter number, sorted by it (stable), and the
+        sorted numbers themselves for bisecting. Cached until the next append.
+        """
+        if self._by_number is None:
+            order = sorted(self._known(self.numbers), key=self.numbers.__getitem__)
+            self._by_number = order, array('d', map(self.numbers.__getitem__, order))
+        return self._by_number
+
+    def take(self, positions: Sequence[int]) -> 'ChapterTable':
+        """New table holding the given rows, in the given order."""
+        table = ChapterTable()
+        table.scanlators = list(self.scanlators)
+        table._scanlator_ids = dict(self._scanlator_ids)
+
+        table.numbers = array('d', map(self.numbers.__getitem__, positions))
+        table.volumes = array('d', map(self.volumes.__getitem__, positions))
+        table.published = array('d', map(self.published.__getitem__, positions))
+        table.updated = array('d', map(self.updated.__getitem__, positions))
+        table.pages = array('l', map(self.pages.__getitem__, positions))
+        table.scanlator_ids = array('l', map(self.scanlator_ids.__getitem__, positions))
+        table.urls = list(map(self.urls.__getitem__, positions))
+        table.titles = list(map(self.titles.__getitem__, positions))
+        table.chapter_ids = list(map(self.chapter_ids.__getitem__, positions))
+        return table
+
+    def sort(self, by: str = 'numbers', descending: bool = False) -> 'ChapterTable':
+        """
+        New table sorted on a numeric column ('numbers', 'volumes',
+        'published', 'updated' or 'pages'). Rows with unknown values go last.
+        """
+        if by == 'numbers':
+            known = list(self.by_number()[0])
+            if descending:
+                known.sort(key=self.numbers.__getitem__, reverse=True)
+        else:
+            column = getattr(self, by)
+            known = sorted(self._known(column), key=column.__getitem__, reverse=descending)
+        known_set = set(known)
+        unknown = [i for i in range(len(self)) if i not in known_set]
+        return self.take(known + unknown)
+
+    def filter_scanlator(self, name: str) -> 'ChapterTable':
+        scanlator_id = self._scanlator_ids.get(name)
+        return self.take(list(compress(range(len(self)), [sid == scanlator_id for sid in self.scanlator_ids])))
+
+    def best_per_chapter(self, preferred_scanlators: Sequence[str] = ()) -> 'ChapterTable':
+        """
+        Keep one scanlation per chapter number, sorted by number.
+
+        A row wins if its scanlator comes earliest in preferred_scanlators,
+        then by most pages, then by earliest publication. Rows without a
+        chapter number are all kept, at the end.
+        """
+        rank = {self._scanlator_ids[name]: i for i, name in enumerate(preferred_scanlators)
+                if name in self._scanlator_ids}
+        unranked = len(rank)
+
+        def key(position: int) -> Tuple:
+            published = self.published[position]
+            return (
+                self.numbers[position],
+                rank.get(self.scanlator_ids[position], unranked),
+                -self.pages[position],
+                published if not math.isnan(published) else math.inf
+            )
+
+        # One sort with the score in the key, the first row of each number wins
+        ordered = sorted(self.by_number()[0], key=key)
+        best = []
+        last = None
+        for position in ordered:
+            number = self.numbers[position]
+            if number != last:
+                best.append(position)
+                last = number
+
+        unnumbered = list(compress(range(len(self)), [math.isnan(value) for value in self.numbers]))
+        return self.take(best + unnumbered)
+
+    def range(self, start: float, end: float) -> 'ChapterTable':
+        """Rows with start <= chapter number <= end, sorted by number."""
+        order, numbers = self.by_number()
+        return self.take(order[bisect_left(numbers, start):bisect_right(numbers, end)])
+
+    def neighbours(self, url: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        (previous, next) chapter URLs by chapter number, skipping other
+        scanlations of the same number. None past either end.
+        """
+        position = self.position(url)
+        if position is None or math.isnan(self.numbers[position]):
+            return None, None
+
+        order, numbers = self.by_number()
+        number = self.numbers[position]
+        lower = bisect_left(numbers, number)
+        higher = bisect_right(numbers, number)
+
+        # The first row of the neighbouring number, as in source order
+        previous = order[bisect_left(numbers, numbers[lower - 1])] if lower > 0 else None
+        following = order[higher] if higher < len(order) else None
+        return (
+            self.urls[previous] if previous is not None else None,
+            self.urls[following] if following is not None else None
+        )
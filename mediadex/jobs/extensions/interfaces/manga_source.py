@@ -1,22 +1,79 @@
 from abc import ABC, abstractmethod
+from typing import Dict, Iterator, Optional
 import requests
 from bs4 import BeautifulSoup
+from .chapter_index import ChapterIndex, chapter_indexes
+from .chapter_table import ChapterTable
 
 class MangaSource(ABC):
+    # Chapter index lifetime, and minimum age before an unknown chapter
+    # URL triggers an early rebuild
+    CHAPTER_INDEX_TTL = 300
+    CHAPTER_INDEX_MIN_AGE = 30
+
     @abstractmethod
     def search(self, query: str):
-        """Search for manga, returns list of dict {title, url}"""
+        """Search for manga, returns list of Manga records"""
         pass
 
     @abstractmethod
     def get_chapters(self, manga_url: str):
-        """Returns the list of chapters for a given manga"""
+        """Returns the list of Chapter records for a given manga"""
         pass
 
     @abstractmethod
     def get_pages(self, chapter_url: str):
-        """Returns the list of page URLs for a chapter"""
+        """Returns the list of PageRef records for a chapter"""
+        pass
+
+    def refresh_pages(self, chapter_url: str):
+        """
+        Returns fresh PageRef records after a page image failed to load
+        (e.g. 403). Sources that cache page URLs override this.
+        """
+        return self.get_pages(chapter_url)
+
+    def record_page_transfer(self, page, size: int, seconds: float, latency: Optional[float] = None):
+        """
+        Called by download stages with the size and duration of each
+        streamed page download, and the part of it spent waiting for the
+        response headers. Time spent waiting for a host slot is not
+        included. Sources that adapt to bandwidth override this.
+        """
         pass
+
+    def fetch_page(self, page, stream: bool = False, headers: Optional[Dict] = None) -> requests.Response:
+        """
+        Download a page image from get_pages() with the source's session and
+        the page's Referer, plus any extra headers (e.g. Range). With
+        stream=True the body is left unread.
+        """
+        headers = dict(headers or {})
+        if page.referer:
+            headers['Referer'] = page.referer
+        return self.session.get(page.url, headers=headers, stream=stream)
+    
+    def iter_search(self, query: str) -> Iterator[Dict]:
+        """
+        Yield search results as they are parsed.
+        Sources override this and make search() a list() of it.
+        """
+        yield from self.search(query)
+    
+    def iter_chapters(self, manga_url: str) -> Iterator[Dict]:
+        """
+        Yield the chapters of a manga as they are parsed, so callers can
+        start processing before the last page has been downloaded.
+        Sources override this and make get_chapters() a list() of it.
+        """
+        yield from self.get_chapters(manga_url)
+    
+    def get_chapter_table(self, manga_url: str) -> ChapterTable:
+        """
+        Returns the chapters of a manga as a columnar ChapterTable, built
+        straight from iter_chapters without an intermediate list.
+        """
+        return ChapterTable.from_chapters(self.iter_chapters(manga_url))
     
     def get_next_chapter(self, current_chapter_url: str, manga_url: str = None):
         """
@@ -41,3 +98,42 @@ class MangaSource(ABC):
             'next': self.get_next_chapter(current_chapter_url, manga_url),
             'previous': self.get_previous_chapter(current_chapter_url, manga_url)
         }
+    
+    def _chapter_index_namespace(self) -> tuple:
+        """Key separating this source's chapter indexes from other sources."""
+        return (type(self).__name__,)
+    
+    def _resolve_manga_url(self, chapter_url: str) -> Optional[str]:
+        """Find the manga URL of a chapter that is not indexed yet."""
+        return None
+    
+    def _load_chapter_urls(self, manga_url: str) -> list:
+        """
+        Chapter URLs of a manga for its index. Sources that cache chapter
+        lists longer than CHAPTER_INDEX_TTL override this to revalidate them.
+        """
+        return [chapter.url for chapter in self.get_chapters(manga_url)]
+    
+    def get_chapter_index(self, manga_url: str) -> ChapterIndex:
+        """Get the shared chapter index of a manga, rebuilt when stale."""
+        return chapter_indexes.get(
+            self._chapter_index_namespace(),
+            manga_url,
+            lambda: self._load_chapter_urls(manga_url),
+            self.CHAPTER_INDEX_TTL
+        )
+    
+    def _find_chapter_index(self, chapter_url: str, manga_url: str = None) -> Optional[ChapterIndex]:
+        """Get the chapter index containing chapter_url, None if not found."""
+        namespace = self._chapter_index_namespace()
+        if not manga_url:
+            manga_url = chapter_indexes.manga_for(namespace, chapter_url) or self._resolve_manga_url(chapter_url)
+            if not manga_url:
+                return None
+        
+        index = self.get_chapter_index(manga_url)
+        if chapter_url not in index and index.is_stale(self.CHAPTER_INDEX_MIN_AGE):
+            # The chapter may have been released after the index was built
+            chapter_indexes.invalidate(namespace, manga_url)
+            index = self.get_chapter_index(manga_url)
+        return index
@@ -0,0 +1,206 @@
+import re
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+class Record:
+    """
+    Base for the slotted result records returned by sources.
+
+    Records also answer the dict-style access (record['title'],
+    record.get('title'), 'title' in record) the sources used to return
+    plain dicts for, including the old per-source key names listed in
+    ALIASES. A field set to None counts as missing.
+    """
+
+    __slots__ = ()
+    ALIASES: Dict[str, str] = {}
+
+    def _field(self, key: str) -> str:
+        name = self.ALIASES.get(key, key)
+        if name not in self.__slots__:
+            raise KeyError(key)
+        return name
+
+    def __getitem__(self, key: str):
+        return getattr(self, self._field(key))
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def keys(self) -> List[str]:
+        return list(self.__slots__)
+
+    def items(self):
+        return self.to_dict().items()
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __hash__(self):
+        # Every record has a url, and equal records always share it
+        return hash((type(self), self.url))
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__
+                           if getattr(self, name) is not None)
+        return f"{type(self).__name__}({fields})"
+
+
+class Manga(Record):
+    """Manga returned by search, listings and details."""
+
+    __slots__ = ('title', 'url', 'description', 'cover_url', 'author', 'artist',
+                 'status', 'tags', 'year', 'original_language', 'manga_id')
+    ALIASES = {
+        'thumbnail': 'cover_url',
+        'thumbnail_url': 'cover_url',
+        'genres': 'tags',
+    }
+
+    def __init__(self, title: str, url: str, description: Optional[str] = None,
+                 cover_url: Optional[str] = None, author: Optional[str] = None,
+                 artist: Optional[str] = None, status: Optional[str] = None,
+                 tags: Optional[List[str]] = None, year: Optional[int] = None,
+                 original_language: Optional[str] = None, manga_id: Optional[str] = None):
+        self.title = title
+        self.url = url
+        self.description = description
+        self.cover_url = cover_url
+        self.author = author
+        self.artist = artist
+        self.status = status
+        self.tags = tags
+        self.year = year
+        self.original_language = original_language
+        self.manga_id = manga_id
+
+
+class Chapter(Record):
+    """
+    Chapter of a manga. published_at and updated_at are Unix timestamps,
+    chapter_number is parsed to a float when possible. upload_time keeps
+    the upload text shown by sites that only give a relative date
+    (e.g. '3 days ago' on Bato.to).
+    """
+
+    __slots__ = ('title', 'url', 'chapter_number', 'volume', 'scanlator',
+                 'published_at', 'updated_at', 'pages', 'chapter_id', 'upload_time')
+    ALIASES = {
+        'publish_at': 'published_at',
+        'date_upload': 'published_at',
+    }
+
+    def __init__(self, title: str, url: str, chapter_number: Optional[float] = None,
+                 volume: Optional[str] = None, scanlator: Optional[str] = None,
+                 published_at: Optional[float] = None, updated_at: Optional[float] = None,
+                 pages: Optional[int] = None, chapter_id: Optional[str] = None,
+                 upload_time: Optional[str] = None):
+        self.title = title
+        self.url = url
+        self.chapter_number = chapter_number
+        self.volume = volume
+        self.scanlator = scanlator
+        self.published_at = published_at
+        self.updated_at = updated_at
+        self.pages = pages
+        self.chapter_id = chapter_id
+        self.upload_time = upload_time
+
+
+class PageRef(str):
+    """
+    Page image of a chapter.
+
+    A str subclass whose value is the page URL, so callers written against
+    URL lists (split, json.dumps, requests.get, ...) keep working, with the
+    page's number, referer, quality and chapter_url as attributes. quality
+    names the image variant when the source offers several (e.g. 'data' or
+    'data-saver' on MangaDex). chapter_url lets a source renew the page's
+    URL by itself when it has expired.
+
+    str subclasses cannot have __slots__, so the attributes live in a small
+    instance dict; pages are only held per chapter, not per sync.
+    """
+
+    def __new__(cls, url: str, number: int, referer: Optional[str] = None,
+                quality: Optional[str] = None, chapter_url: Optional[str] = None):
+        page = super().__new__(cls, url)
+        page.number = number
+        page.referer = referer
+        page.quality = quality
+        page.chapter_url = chapter_url
+        return page
+
+    def __getnewargs__(self):
+        return (self.url, self.number, self.referer, self.quality, self.chapter_url)
+
+    @property
+    def url(self) -> str:
+        return str.__str__(self)
+
+    def __repr__(self):
+        return f"PageRef({self.number}, {self.url!r})"
+
+    def to_dict(self) -> Dict:
+        return {'url': self.url, 'number': self.number, 'referer': self.referer,
+                'quality': self.quality, 'chapter_url': self.chapter_url}
+
+
+CHAPTER_NUMBER_PATTERN = re.compile(r'(?:ch(?:apter)?|episode|ep)\.?\s*(\d+(?:\.\d+)?)', re.IGNORECASE)
+RELATIVE_TIME_PATTERN = re.compile(r'(\d+|an?)\s+(sec|min|hour|day|week|month|year)s?\s+ago', re.IGNORECASE)
+RELATIVE_TIME_UNITS = {
+    'sec': 1,
+    'min': 60,
+    'hour': 3600,
+    'day': 86400,
+    'week': 7 * 86400,
+    'month': 30 * 86400,
+    'year': 365 * 86400,
+}
+
+
+def parse_chapter_number(value) -> Optional[float]:
+    """Parse '12.5', 12 or 'Chapter 12.5: Title' into a float."""
+    if value is None or value == '':
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+
+    match = CHAPTER_NUMBER_PATTERN.search(str(value))
+    return float(match.group(1)) if match else None
+
+
+def parse_timestamp(value) -> Optional[float]:
+    """Parse an ISO date, a timestamp or text like '3 days ago' into a Unix timestamp."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        pass
+
+    match = RELATIVE_TIME_PATTERN.search(value)
+    if match:
+        amount = 1 if match.group(1).lower() in ('a', 'an') else int(match.group(1))
+        return time.time() - amount * RELATIVE_TIME_UNITS[match.group(2).lower()]
+
+    return None
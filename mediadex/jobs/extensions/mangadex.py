@@ -1,9 +1,54 @@
 import requests
 import json
 import time
-from typing import List, Dict, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Optional, Set, Tuple
 from urllib.parse import urljoin, urlparse
 from .interfaces.manga_source import MangaSource
+from .interfaces.records import Chapter, Manga, PageRef, parse_chapter_number, parse_timestamp
+from .rate_limiter import RateLimiter, get_rate_limiter
+from .response_cache import CacheEntry, ResponseCache
+from .memo import TTLMemo
+from .sync_cursors import SyncCursorStore
+from .bandwidth import BandwidthEstimator
+from .image_hosts import ImageHostSelector
+from .singleflight import SingleFlight
+from .throttle import adapt_bucket_rate
+from .transport import Transport, TransportSession, get_transport
+
+
+# Manga records with their API version, keyed by (language, manga ID) and
+# shared by every instance so repeated latest-update polls skip known manga
+manga_memo = TTLMemo(ttl=6 * 3600)
+
+# Identical API calls in flight across all MangaDexSource instances
+inflight = SingleFlight()
+
+# At-home data, shared by every instance: the chapter's file list (hash and
+# filenames, stable until the chapter is re-uploaded) is kept apart from the
+# short-lived image server baseUrl, so renewing the host keeps the list
+at_home_manifests = TTLMemo(ttl=24 * 3600)
+at_home_servers = TTLMemo(ttl=10 * 60)
+
+
+# Measured MD@Home node health, pages move to the canonical uploads host
+# when their node is slow or failing
+image_hosts = ImageHostSelector("https://uploads.mangadex.org", path_start=r'/data(-saver)?/')
+
+
+# Page download throughput, drives use_data_saver='auto'
+bandwidth = BandwidthEstimator()
+
+
+class AtHomeManifest:
+    """File list of a chapter as returned by /at-home/server."""
+
+    __slots__ = ('hash', 'data', 'data_saver')
+
+    def __init__(self, hash: str, data: List[str], data_saver: List[str]):
+        self.hash = hash
+        self.data = data
+        self.data_saver = data_saver
 
 
 class MangaDexSource(MangaSource):
@@ -14,6 +59,7 @@ class MangaDexSource(MangaSource):
     
     BASE_URL = "https://mangadex.org"
     API_BASE_URL = "https://api.mangadex.org"
+    UPLOADS_URL = "https://uploads.mangadex.org"
     
     # API endpoints
     API_MANGA_URL = f"{API_BASE_URL}/manga"
@@ -25,6 +71,10 @@ class MangaDexSource(MangaSource):
     # Constants
     MANGA_LIMIT = 20
     LATEST_CHAPTER_LIMIT = 100
+    CHAPTER_PAGE_LIMIT = 500  # Max API limit
+    MANGA_IDS_LIMIT = 100  # Max ids[] per request
+    STATISTICS_IDS_LIMIT = 100
+    MAX_CONCURRENT_REQUESTS = 8
     COVER_ART = "cover_art"
     AUTHOR = "author"
     ARTIST = "artist"
@@ -60,44 +110,187 @@ class MangaDexSource(MangaSource):
         "4f1de6a2-f0c5-4ac5-bce5-02c7dbb67deb",  # MangaPlus
     ]
     
-    def __init__(self, language: str = "en", preferences: Optional[Dict] = None):
+    # Rate limits as (requests per second, burst size)
+    RATE_LIMITS = {
+        RateLimiter.DEFAULT_BUCKET: (3.0, 5),  # ~3 requests per second
+        'at-home': (40 / 60, 40),  # 40 requests per minute
+    }
+    # Range the default bucket's rate may adapt within from X-RateLimit headers
+    RATE_LIMIT_FLOOR = 1.0
+    RATE_LIMIT_CEILING = 5.0  # Documented global limit
+    
+    # Seconds a page should take to arrive with use_data_saver='auto'
+    TARGET_PAGE_TIME = 2.0
+    
+    # At-home baseUrl is valid for about 15 minutes, renew it a bit earlier
+    AT_HOME_SERVER_TTL = 10 * 60
+    AT_HOME_MANIFEST_TTL = 24 * 3600
+    
+    # Response cache TTLs in seconds, per endpoint
+    CACHE_TTLS = {
+        'manga': 6 * 3600,
+        'chapters': 15 * 60,
+        'cover': 24 * 3600,
+        'statistics': 3600,
+    }
+    
+    def __init__(self, language: str = "en", preferences: Optional[Dict] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 transport: Optional[Transport] = None):
         """
         Initialize MangaDex source with language and preferences.
         
         Args:
             language: Target language code (e.g., 'en', 'fr', 'es')
             preferences: User preferences dict
+            rate_limiter: Limiter to draw from, defaults to the process-wide one
+            cache: Response cache for manga, chapter, cover and statistics calls,
+                defaults to one at preferences['cache_path'] if set
+            transport: HTTP transport, defaults to the process-wide one
         """
         self.language = language
         self.dex_language = language  # MangaDex language code
         self.preferences = preferences or {}
         
-        # Setup session with proper headers
-        self.session = requests.Session()
+        # Setup session with proper headers on the shared transport
+        self.session = TransportSession(transport or get_transport())
         self.session.headers.update({
             'User-Agent': 'MediaDex/1.0 (Python)',
             'Referer': f'{self.BASE_URL}/',
             'Origin': self.BASE_URL,
         })
         
-        # Rate limiting
-        self.last_request_time = 0
-        self.min_request_interval = 0.34  # ~3 requests per second
+        # Rate limiting, shared by every instance in the process
+        self.rate_limiter = rate_limiter or get_rate_limiter('mangadex', self.RATE_LIMITS)
+        
+        # Response caching, TTLs can be overridden per endpoint
+        if cache is None and self.preferences.get('cache_path'):
+            cache = ResponseCache(self.preferences['cache_path'])
+        self.cache = cache
+        self.cache_ttls = {**self.CACHE_TTLS, **self.preferences.get('cache_ttls', {})}
+    
+    def _rate_limit_endpoint(self, url: str) -> str:
+        """Get the rate limit bucket for a request URL."""
+        if url.startswith(self.API_AT_HOME_URL):
+            return 'at-home'
+        return RateLimiter.DEFAULT_BUCKET
     
-    def _rate_limit(self):
+    def _rate_limit(self, url: str):
         """Implement rate limiting to respect API limits."""
-        current_time = time.time()
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < self.min_request_interval:
-            time.sleep(self.min_request_interval - time_since_last)
-        self.last_request_time = time.time()
+        self.rate_limiter.acquire(self._rate_limit_endpoint(url))
     
-    def _make_request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
-        """Make a rate-limited request to the API."""
-        self._rate_limit()
-        response = self.session.get(url, params=params)
+    def _fetch(self, url: str, params: Optional[Dict] = None,
+               headers: Optional[Dict] = None) -> requests.Response:
+        """
+        Make a rate-limited request to the API, bypassing the cache. Retries
+        made by the transport draw a rate limit token too.
+        """
+        response = self.session.get(url, params=params, headers=headers,
+                                    pace=lambda: self._rate_limit(url))
+        self._adapt_rate(url, response)
         response.raise_for_status()
         return response
+
+    def _adapt_rate(self, url: str, response: requests.Response):
+        """Nudge the default bucket's rate towards what the API reports as allowed."""
+        if self._rate_limit_endpoint(url) != RateLimiter.DEFAULT_BUCKET:
+            return
+        adapt_bucket_rate(
+            self.rate_limiter.buckets[RateLimiter.DEFAULT_BUCKET],
+            response.status_code,
+            response.headers,
+            self.RATE_LIMIT_FLOOR,
+            self.RATE_LIMIT_CEILING
+        )
+    
+    def _cache_endpoint(self, url: str, params: Optional[Dict] = None) -> Optional[str]:
+        """Get the cache TTL key for a request, None if it must not be cached."""
+        if url.startswith(f"{self.API_BASE_URL}/statistics/manga"):
+            return 'statistics'
+        if url.startswith(self.API_COVER_URL):
+            return 'cover'
+        if url == self.API_CHAPTER_URL and params and 'manga' in params:
+            # Incremental syncs must always see the live delta
+            if 'updatedAtSince' in params:
+                return None
+            return 'chapters'
+        if url.startswith(f"{self.API_MANGA_URL}/"):
+            manga_id = url[len(self.API_MANGA_URL) + 1:]
+            if self._is_valid_uuid(manga_id):
+                return 'manga'
+        return None
+    
+    def _cache_lookup(self, url: str, params: Optional[Dict] = None):
+        """
+        Look a request up in the cache.
+        
+        Returns (key, entry, response): response is set when the entry is
+        fresh, key is None when the request is not cacheable.
+        """
+        endpoint = self._cache_endpoint(url, params)
+        if self.cache is None or endpoint is None or not self.cache_ttls.get(endpoint):
+            return None, None, None
+        
+        key = self.cache.make_key(url, params)
+        entry = self.cache.get(key)
+        if entry and entry.is_fresh():
+            return key, entry, entry.to_response()
+        return key, entry, None
+    
+    def _cache_update(self, key: str, entry: Optional[CacheEntry],
+                      response: requests.Response, url: str,
+                      params: Optional[Dict] = None) -> requests.Response:
+        """Store a fetched response, or serve the cached body after a 304."""
+        ttl = self.cache_ttls[self._cache_endpoint(url, params)]
+        if response.status_code == 304 and entry is not None:
+            self.cache.refresh(key, ttl)
+            return entry.to_response()
+        
+        self.cache.store(key, response, ttl)
+        return response
+    
+    def _make_request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """
+        Make a rate-limited request to the API, served from cache when possible.
+        Concurrent identical calls share one fetch (and one rate limit token).
+        """
+        return inflight.do(ResponseCache.make_key(url, params), lambda: self._request(url, params))
+
+    def _request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        key, entry, cached = self._cache_lookup(url, params)
+        if cached is not None:
+            return cached
+        if key is None:
+            return self._fetch(url, params)
+        
+        response = self._fetch(url, params, entry.validators() if entry else None)
+        return self._cache_update(key, entry, response, url, params)
+    
+    def _iter_requests(self, calls: List[Tuple[str, Optional[Dict]]]) -> Iterator[requests.Response]:
+        """
+        Make several (url, params) requests concurrently, yielding responses
+        in order as they arrive. The shared rate limiter keeps the batch
+        within budget.
+        """
+        if len(calls) <= 1:
+            for url, params in calls:
+                yield self._make_request(url, params)
+            return
+        
+        workers = min(len(calls), self.MAX_CONCURRENT_REQUESTS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._make_request, url, params) for url, params in calls]
+            try:
+                for future in futures:
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+    
+    def _make_requests(self, calls: List[Tuple[str, Optional[Dict]]]) -> List[requests.Response]:
+        """Make several (url, params) requests concurrently, returning responses in order."""
+        return list(self._iter_requests(calls))
     
     def _is_valid_uuid(self, uuid_string: str) -> bool:
         """Check if string is a valid UUID."""
@@ -165,10 +358,10 @@ class MangaDexSource(MangaSource):
         """Build cover image URL."""
         if not filename:
             return ""
-        return f"https://uploads.mangadex.org/covers/{manga_id}/{filename}.{quality}.jpg"
+        return f"{self.UPLOADS_URL}/covers/{manga_id}/{filename}.{quality}.jpg"
     
-    def _create_manga_from_data(self, manga_data: Dict, cover_filename: str = None) -> Dict:
-        """Create manga dict from API data."""
+    def _create_manga_from_data(self, manga_data: Dict, cover_filename: str = None) -> Manga:
+        """Create manga record from API data."""
         attributes = manga_data.get('attributes', {})
         manga_id = manga_data.get('id', '')
         
@@ -213,22 +406,22 @@ class MangaDexSource(MangaSource):
             elif rel.get('type') == self.ARTIST:
                 artist = rel.get('attributes', {}).get('name', '')
         
-        return {
-            'title': title,
-            'url': self._build_manga_url(manga_id),
-            'description': description,
-            'cover_url': cover_url,
-            'author': author,
-            'artist': artist,
-            'status': attributes.get('status', ''),
-            'tags': [tag.get('attributes', {}).get('name', {}).get('en', '') 
-                    for tag in attributes.get('tags', [])],
-            'year': attributes.get('year'),
-            'original_language': attributes.get('originalLanguage', ''),
-            'manga_id': manga_id
-        }
+        return Manga(
+            title=title,
+            url=self._build_manga_url(manga_id),
+            description=description,
+            cover_url=cover_url,
+            author=author,
+            artist=artist,
+            status=attributes.get('status', ''),
+            tags=[tag.get('attributes', {}).get('name', {}).get('en', '') 
+                  for tag in attributes.get('tags', [])],
+            year=attributes.get('year'),
+            original_language=attributes.get('originalLanguage', ''),
+            manga_id=manga_id
+        )
     
-    def search(self, query: str) -> List[Dict]:
+    def search(self, query: str) -> List[Manga]:
         """
         Search for manga with support for various search types.
         
@@ -240,51 +433,75 @@ class MangaDexSource(MangaSource):
         - Group search: "group:group-uuid"
         - Author search: "author:author-uuid"
         - List search: "list:list-uuid"
+        
+        Text searches return the first page of results.
+        """
+        return list(self._iter_search(query, paginate=False))
+    
+    def iter_search(self, query: str) -> Iterator[Manga]:
+        """
+        Yield search results as each response is parsed.
+        Text searches continue page by page until results run out.
         """
+        return self._iter_search(query, paginate=True)
+    
+    def _iter_search(self, query: str, paginate: bool) -> Iterator[Manga]:
+        """Dispatch a search query to the matching search type."""
         query = query.strip()
         
         try:
             if query.startswith(self.PREFIX_CHAPTER_SEARCH):
-                return self._search_by_chapter(query[len(self.PREFIX_CHAPTER_SEARCH):])
+                yield from self._search_by_chapter(query[len(self.PREFIX_CHAPTER_SEARCH):])
             elif query.startswith(self.PREFIX_USER_SEARCH):
-                return self._search_by_user(query[len(self.PREFIX_USER_SEARCH):])
+                yield from self._search_by_user(query[len(self.PREFIX_USER_SEARCH):])
             elif query.startswith(self.PREFIX_LIST_SEARCH):
-                return self._search_by_list(query[len(self.PREFIX_LIST_SEARCH):])
+                yield from self._search_by_list(query[len(self.PREFIX_LIST_SEARCH):])
             elif query.startswith(self.PREFIX_ID_SEARCH):
-                return self._search_by_id(query[len(self.PREFIX_ID_SEARCH):])
+                yield from self._search_by_id(query[len(self.PREFIX_ID_SEARCH):])
             elif query.startswith(self.PREFIX_GROUP_SEARCH):
-                return self._search_by_group(query[len(self.PREFIX_GROUP_SEARCH):])
+                yield from self._search_by_group(query[len(self.PREFIX_GROUP_SEARCH):])
             elif query.startswith(self.PREFIX_AUTHOR_SEARCH):
-                return self._search_by_author(query[len(self.PREFIX_AUTHOR_SEARCH):])
+                yield from self._search_by_author(query[len(self.PREFIX_AUTHOR_SEARCH):])
             else:
-                return self._search_by_title(query)
+                yield from self._search_by_title(query, paginate)
         except Exception as e:
             print(f"Error searching for '{query}': {e}")
-            return []
     
-    def _search_by_title(self, title: str) -> List[Dict]:
-        """Search manga by title."""
-        params = {
+    def _is_title_search(self, query: str) -> bool:
+        """Whether a query is a plain title search, not one of the prefixed ones."""
+        prefixes = (self.PREFIX_CHAPTER_SEARCH, self.PREFIX_USER_SEARCH, self.PREFIX_LIST_SEARCH,
+                    self.PREFIX_ID_SEARCH, self.PREFIX_GROUP_SEARCH, self.PREFIX_AUTHOR_SEARCH)
+        return not query.strip().startswith(prefixes)
+    
+    def _title_search_params(self, title: str, offset: int) -> Dict:
+        """Build title search request parameters for one page."""
+        return {
             'title': title,
             'limit': self.MANGA_LIMIT,
-            'offset': 0,
+            'offset': offset,
             'includes[]': [self.COVER_ART],
             'contentRating[]': self._get_content_ratings(),
             'originalLanguage[]': self._get_original_languages(),
             'availableTranslatedLanguage[]': [self.dex_language]
         }
+    
+    def _search_by_title(self, title: str, paginate: bool = False) -> Iterator[Manga]:
+        """Search manga by title, yielding results page by page."""
+        offset = 0
         
-        response = self._make_request(self.API_MANGA_URL, params)
-        data = response.json()
-        
-        results = []
-        for manga_data in data.get('data', []):
-            manga = self._create_manga_from_data(manga_data)
-            results.append(manga)
-        
-        return results
+        while True:
+            response = self._make_request(self.API_MANGA_URL, self._title_search_params(title, offset))
+            data = response.json()
+            
+            mangas = data.get('data', [])
+            for manga_data in mangas:
+                yield self._create_manga_from_data(manga_data)
+            
+            offset += len(mangas)
+            if not paginate or not mangas or offset >= data.get('total', 0):
+                break
     
-    def _search_by_id(self, manga_id: str) -> List[Dict]:
+    def _search_by_id(self, manga_id: str) -> List[Manga]:
         """Search manga by ID."""
         if not self._is_valid_uuid(manga_id):
             raise ValueError("Invalid manga ID format")
@@ -305,7 +522,7 @@ class MangaDexSource(MangaSource):
         
         return results
     
-    def _search_by_chapter(self, chapter_id: str) -> List[Dict]:
+    def _search_by_chapter(self, chapter_id: str) -> List[Manga]:
         """Search manga by chapter ID."""
         if not self._is_valid_uuid(chapter_id):
             raise ValueError("Invalid chapter ID format")
@@ -325,7 +542,7 @@ class MangaDexSource(MangaSource):
         
         return self._search_by_id(manga_id)
     
-    def _search_by_group(self, group_id: str) -> List[Dict]:
+    def _search_by_group(self, group_id: str) -> List[Manga]:
         """Search manga by scanlation group."""
         if not self._is_valid_uuid(group_id):
             raise ValueError("Invalid group ID format")
@@ -348,7 +565,7 @@ class MangaDexSource(MangaSource):
         
         return results
     
-    def _search_by_author(self, author_id: str) -> List[Dict]:
+    def _search_by_author(self, author_id: str) -> List[Manga]:
         """Search manga by author."""
         if not self._is_valid_uuid(author_id):
             raise ValueError("Invalid author ID format")
@@ -371,7 +588,7 @@ class MangaDexSource(MangaSource):
         
         return results
     
-    def _search_by_user(self, user_id: str) -> List[Dict]:
+    def _search_by_user(self, user_id: str) -> List[Manga]:
         """Search manga by uploader."""
         if not self._is_valid_uuid(user_id):
             raise ValueError("Invalid user ID format")
@@ -418,7 +635,7 @@ class MangaDexSource(MangaSource):
         
         return results
     
-    def _search_by_list(self, list_id: str) -> List[Dict]:
+    def _search_by_list(self, list_id: str) -> List[Manga]:
         """Search manga by custom list."""
         if not self._is_valid_uuid(list_id):
             raise ValueError("Invalid list ID format")
@@ -452,7 +669,7 @@ class MangaDexSource(MangaSource):
         
         return results
     
-    def get_popular_manga(self, page: int = 1) -> List[Dict]:
+    def get_popular_manga(self, page: int = 1) -> List[Manga]:
         """Get popular manga sorted by follow count."""
         offset = (page - 1) * self.MANGA_LIMIT
         
@@ -476,8 +693,14 @@ class MangaDexSource(MangaSource):
         
         return results
     
-    def get_latest_updates(self, page: int = 1) -> List[Dict]:
-        """Get latest manga updates."""
+    def get_latest_updates(self, page: int = 1) -> List[Manga]:
+        """
+        Get latest manga updates.
+        
+        The chapter feed is requested with the manga relationship expanded,
+        so only manga missing from the memo, or whose version changed, need
+        the second /manga request (which also brings the cover art).
+        """
         offset = (page - 1) * self.LATEST_CHAPTER_LIMIT
         
         # Get latest chapters
@@ -487,6 +710,7 @@ class MangaDexSource(MangaSource):
             'translatedLanguage[]': [self.dex_language],
             'order[publishAt]': 'desc',
             'includeFutureUpdates': '0',
+            'includes[]': ['manga'],
             'originalLanguage[]': self._get_original_languages(),
             'contentRating[]': self._get_content_ratings(),
             'excludedGroups[]': self._get_blocked_groups(),
@@ -498,36 +722,51 @@ class MangaDexSource(MangaSource):
         response = self._make_request(self.API_CHAPTER_URL, params)
         data = response.json()
         
-        # Extract unique manga IDs
-        manga_ids = set()
+        # Extract unique manga IDs in feed order, with their inline version
+        versions = {}
         for chapter in data.get('data', []):
             for rel in chapter.get('relationships', []):
-                if rel.get('type') == 'manga':
-                    manga_ids.add(rel.get('id'))
+                if rel.get('type') == 'manga' and rel.get('id') not in versions:
+                    versions[rel.get('id')] = rel.get('attributes', {}).get('version')
         
-        if not manga_ids:
+        if not versions:
             return []
         
-        # Get manga details
-        params = {
-            'ids[]': list(manga_ids),
-            'includes[]': [self.COVER_ART],
-            'limit': len(manga_ids),
-            'contentRating[]': self._get_content_ratings()
-        }
-        
-        response = self._make_request(self.API_MANGA_URL, params)
-        data = response.json()
+        # Resolve from the memo, renewing stale entries that are unchanged
+        resolved = {}
+        for manga_id, version in versions.items():
+            key = (self.language, manga_id)
+            entry = manga_memo.get(key)
+            if entry is None:
+                entry = manga_memo.get_stale(key)
+                if entry is None or version is None or entry[1] != version:
+                    continue
+                manga_memo.touch(key)
+            resolved[manga_id] = entry[0]
         
-        results = []
-        for manga_data in data.get('data', []):
-            manga = self._create_manga_from_data(manga_data)
-            results.append(manga)
+        unknown_ids = [manga_id for manga_id in versions if manga_id not in resolved]
+        if unknown_ids:
+            # Get manga details
+            params = {
+                'ids[]': unknown_ids,
+                'includes[]': [self.COVER_ART],
+                'limit': len(unknown_ids),
+                'contentRating[]': self._get_content_ratings()
+            }
+            
+            response = self._make_request(self.API_MANGA_URL, params)
+            data = response.json()
+            
+            for manga_data in data.get('data', []):
+                manga = self._create_manga_from_data(manga_data)
+                version = manga_data.get('attributes', {}).get('version')
+                manga_memo.set((self.language, manga.manga_id), (manga, version))
+                resolved[manga.manga_id] = manga
         
-        return results
+        return [resolved[manga_id] for manga_id in versions if manga_id in resolved]
     
-    def get_manga_details(self, manga_url: str) -> Dict:
-        """Get detailed manga information."""
+    def get_manga_details(self, manga_url: str):
+        """Get detailed manga information, {} when the manga was not found."""
         manga_id = self._extract_id_from_url(manga_url)
         
         if not self._is_valid_uuid(manga_id):
@@ -546,181 +785,424 @@ class MangaDexSource(MangaSource):
         
         return self._create_manga_from_data(manga_data)
     
-    def get_chapters(self, manga_url: str) -> List[Dict]:
-        """Get all chapters for a manga with pagination support."""
+    def get_manga_details_many(self, manga_urls: List[str]) -> Dict[str, Optional[Manga]]:
+        """
+        Get detailed information for many manga at once.
+        
+        IDs are sent in batches of MANGA_IDS_LIMIT through 'ids[]', and the
+        batches are requested concurrently.
+        
+        Returns:
+            Dict keyed by manga ID. IDs the API did not return map to None.
+        """
+        manga_ids = list(dict.fromkeys(self._extract_id_from_url(url) for url in manga_urls))
+        
+        for manga_id in manga_ids:
+            if not self._is_valid_uuid(manga_id):
+                raise ValueError(f"Invalid manga URL format: {manga_id}")
+        
+        calls = []
+        for start in range(0, len(manga_ids), self.MANGA_IDS_LIMIT):
+            batch = manga_ids[start:start + self.MANGA_IDS_LIMIT]
+            params = {
+                'ids[]': batch,
+                'limit': len(batch),
+                'includes[]': [self.COVER_ART, self.AUTHOR, self.ARTIST],
+                'contentRating[]': self.ALL_CONTENT_RATINGS
+            }
+            calls.append((self.API_MANGA_URL, params))
+        
+        results = dict.fromkeys(manga_ids)
+        for response in self._make_requests(calls):
+            for manga_data in response.json().get('data', []):
+                manga_id = manga_data.get('id')
+                if manga_id in results:
+                    results[manga_id] = self._create_manga_from_data(manga_data)
+        
+        return results
+    
+    def _create_chapter_from_data(self, chapter_data: Dict) -> Optional[Chapter]:
+        """Create chapter record from API data, None for invalid chapters."""
+        attributes = chapter_data.get('attributes', {})
+        
+        # Skip invalid chapters
+        if attributes.get('isInvalid', False):
+            return None
+        
+        chapter_id = chapter_data.get('id', '')
+        title = attributes.get('title') or f"Chapter {attributes.get('chapter', '')}"
+        
+        # Get scanlation group
+        scanlator = "Unknown"
+        for rel in chapter_data.get('relationships', []):
+            if rel.get('type') == 'scanlation_group':
+                scanlator = rel.get('attributes', {}).get('name', 'Unknown')
+                break
+        
+        return Chapter(
+            title=title,
+            url=self._build_chapter_url(chapter_id),
+            chapter_number=parse_chapter_number(attributes.get('chapter')),
+            volume=attributes.get('volume'),
+            scanlator=scanlator,
+            published_at=parse_timestamp(attributes.get('publishAt')),
+            updated_at=parse_timestamp(attributes.get('updatedAt')),
+            pages=attributes.get('pages', 0),
+            chapter_id=chapter_id
+        )
+    
+    def _chapter_feed_params(self, manga_id: str, offset: int, limit: int) -> Dict:
+        """Build chapter list request parameters for one page."""
+        return {
+            'manga': manga_id,
+            'limit': limit,
+            'offset': offset,
+            'translatedLanguage[]': [self.dex_language],
+            'order[volume]': 'desc',
+            'order[chapter]': 'desc',
+            'contentRating[]': self.ALL_CONTENT_RATINGS,
+            'excludedGroups[]': self._get_blocked_groups(),
+            'excludedUploaders[]': self._get_blocked_uploaders()
+        }
+    
+    def _chapter_feed_calls(self, manga_id: str, first: Dict, limit: Optional[int] = None) -> List[Tuple[str, Dict]]:
+        """Plan every remaining feed page from the total the first page reported."""
+        first_page = first.get('data', [])
+        if not first_page:
+            return []
+        
+        wanted = first.get('total', 0)
+        if limit is not None:
+            wanted = min(wanted, limit)
+        
+        return [
+            (self.API_CHAPTER_URL,
+             self._chapter_feed_params(manga_id, offset, min(self.CHAPTER_PAGE_LIMIT, wanted - offset)))
+            for offset in range(len(first_page), wanted, self.CHAPTER_PAGE_LIMIT)
+        ]
+    
+    def get_chapters(self, manga_url: str, limit: Optional[int] = None) -> List[Chapter]:
+        """
+        Get all chapters for a manga with pagination support.
+        
+        Args:
+            manga_url: Manga URL or ID
+            limit: Only return the newest N chapters
+        """
+        return list(self.iter_chapters(manga_url, limit))
+    
+    def iter_chapters(self, manga_url: str, limit: Optional[int] = None) -> Iterator[Chapter]:
+        """
+        Yield the chapters of a manga page by page.
+        
+        The first page reports the total, the remaining pages are then
+        requested concurrently and yielded in order as they arrive.
+        
+        Args:
+            manga_url: Manga URL or ID
+            limit: Only yield the newest N chapters
+        """
         manga_id = self._extract_id_from_url(manga_url)
         
         if not self._is_valid_uuid(manga_id):
             raise ValueError("Invalid manga URL format")
         
-        all_chapters = []
-        offset = 0
-        limit = 500  # Max API limit
+        page_size = self.CHAPTER_PAGE_LIMIT
+        if limit is not None:
+            page_size = min(page_size, limit)
+        
+        response = self._make_request(self.API_CHAPTER_URL, self._chapter_feed_params(manga_id, 0, page_size))
+        data = response.json()
+        first_page = data.get('data', [])
+        
+        calls = self._chapter_feed_calls(manga_id, data, limit)
+        pages = self._iter_requests(calls)
+        chapters = first_page
+        count = 0
         
         while True:
-            params = {
-                'manga': manga_id,
-                'limit': limit,
-                'offset': offset,
-                'translatedLanguage[]': [self.dex_language],
-                'order[volume]': 'desc',
-                'order[chapter]': 'desc',
-                'contentRating[]': self.ALL_CONTENT_RATINGS,
-                'excludedGroups[]': self._get_blocked_groups(),
-                'excludedUploaders[]': self._get_blocked_uploaders()
-            }
-            
-            response = self._make_request(self.API_CHAPTER_URL, params)
-            data = response.json()
+            for chapter_data in chapters:
+                chapter = self._create_chapter_from_data(chapter_data)
+                if chapter:
+                    yield chapter
+                    count += 1
+                    if limit is not None and count >= limit:
+                        pages.close()
+                        return
             
-            chapters = data.get('data', [])
-            if not chapters:
+            response = next(pages, None)
+            if response is None:
                 break
+            chapters = response.json().get('data', [])
+    
+    def get_chapter_updates(self, manga_url: str, cursors: SyncCursorStore) -> List[Chapter]:
+        """
+        Get chapters added or changed since the last sync of a manga.
+        
+        The stored cursor (newest 'updatedAt' seen for this manga and
+        language) is sent as 'updatedAtSince', so only the delta is
+        downloaded. The first sync returns the full feed. Chapters updated
+        exactly at the cursor are returned again, so writes should upsert.
+        
+        The delta is paged by keyset rather than offset: each request asks
+        for 'updatedAtSince' the newest timestamp seen so far, so a chapter
+        updated during the sync moves to the end of the delta instead of
+        shifting an unseen one past a page boundary. The cursor only
+        advances once the last page has been fetched.
+        
+        Args:
+            manga_url: Manga URL or ID
+            cursors: Store holding the cursor per manga and language
+        """
+        manga_id = self._extract_id_from_url(manga_url)
+        
+        if not self._is_valid_uuid(manga_id):
+            raise ValueError("Invalid manga URL format")
+        
+        source_name = type(self).__name__
+        cursor = cursors.get(source_name, manga_id, self.dex_language)
+        
+        # Latest data per chapter ID, a chapter seen twice keeps its newest version
+        updates: Dict[str, Chapter] = {}
+        since = cursor
+        offset = 0
+        while True:
+            params = self._chapter_feed_params(manga_id, offset, self.CHAPTER_PAGE_LIMIT)
+            del params['order[volume]'], params['order[chapter]']
+            params['order[updatedAt]'] = 'asc'
+            if since:
+                params['updatedAtSince'] = since
             
+            chapters = self._make_request(self.API_CHAPTER_URL, params).json().get('data', [])
+            newest = since
             for chapter_data in chapters:
-                attributes = chapter_data.get('attributes', {})
-                
-                # Skip invalid chapters
-                if attributes.get('isInvalid', False):
-                    continue
+                updated_at = chapter_data.get('attributes', {}).get('updatedAt')
+                if updated_at:
+                    # API filters take 'YYYY-MM-DDTHH:MM:SS' without offset
+                    updated_at = updated_at[:19]
+                    if not newest or updated_at > newest:
+                        newest = updated_at
                 
-                chapter_id = chapter_data.get('id', '')
-                title = attributes.get('title') or f"Chapter {attributes.get('chapter', '')}"
-                
-                # Get scanlation group
-                scanlator = "Unknown"
-                for rel in chapter_data.get('relationships', []):
-                    if rel.get('type') == 'scanlation_group':
-                        scanlator = rel.get('attributes', {}).get('name', 'Unknown')
-                        break
-                
-                chapter = {
-                    'title': title,
-                    'url': self._build_chapter_url(chapter_id),
-                    'chapter_number': attributes.get('chapter'),
-                    'volume': attributes.get('volume'),
-                    'scanlator': scanlator,
-                    'publish_at': attributes.get('publishAt'),
-                    'pages': attributes.get('pages', 0),
-                    'chapter_id': chapter_id
-                }
-                
-                all_chapters.append(chapter)
+                chapter = self._create_chapter_from_data(chapter_data)
+                if chapter:
+                    updates.pop(chapter_data.get('id'), None)
+                    updates[chapter_data.get('id')] = chapter
             
-            # Check if there are more chapters
-            if len(chapters) < limit:
+            if len(chapters) < self.CHAPTER_PAGE_LIMIT:
+                since = newest
                 break
-            
-            offset += limit
+            if newest == since:
+                # A whole page shares one timestamp, step over it by offset
+                offset += len(chapters)
+            else:
+                since = newest
+                offset = 0
+        
+        if since and since != cursor:
+            cursors.set(source_name, manga_id, self.dex_language, since)
         
-        return all_chapters
+        return list(updates.values())
     
-    def get_pages(self, chapter_url: str) -> List[str]:
-        """Get page URLs for a chapter using at-home server."""
+    def get_pages(self, chapter_url: str) -> List[PageRef]:
+        """
+        Get page URLs for a chapter using at-home server.
+        The manifest and server are cached; see refresh_pages().
+        
+        preferences['use_data_saver'] picks the file list: True for
+        data-saver, False for full quality, or 'auto' to pick per chapter from
+        measured throughput so a page arrives within
+        preferences['target_page_time'] seconds. Each PageRef's quality
+        tells which one was used.
+        """
         chapter_id = self._extract_id_from_url(chapter_url)
         
         if not self._is_valid_uuid(chapter_id):
             raise ValueError("Invalid chapter URL format")
         
-        # Get at-home server info
-        at_home_url = f"{self.API_AT_HOME_URL}/{chapter_id}"
-        if self.preferences.get('force_standard_https', False):
-            at_home_url += "?forcePort443=true"
-        
-        response = self._make_request(at_home_url)
-        data = response.json()
-        
-        base_url = data.get('baseUrl', '')
-        chapter_info = data.get('chapter', {})
-        hash_value = chapter_info.get('hash', '')
+        base_url, manifest = self._get_at_home(chapter_id)
+        return self._build_pages(chapter_url, base_url, manifest)
+    
+    def _build_pages(self, chapter_url: str, base_url: str, manifest: AtHomeManifest) -> List[PageRef]:
+        """Page URLs of a chapter on its at-home server, in the preferred quality."""
+        base_url = image_hosts.choose(base_url)
         
         # Choose data or data-saver based on preferences
-        if self.preferences.get('use_data_saver', False):
-            files = chapter_info.get('dataSaver', [])
-            data_type = 'data-saver'
-        else:
-            files = chapter_info.get('data', [])
-            data_type = 'data'
+        data_type = self._page_quality()
+        files = manifest.data_saver if data_type == BandwidthEstimator.SAVER else manifest.data
         
         # Build page URLs
         pages = []
         for i, filename in enumerate(files):
-            page_url = f"{base_url}/{data_type}/{hash_value}/{filename}"
-            pages.append(page_url)
+            page_url = f"{base_url}/{data_type}/{manifest.hash}/{filename}"
+            pages.append(PageRef(page_url, i + 1, f'{self.BASE_URL}/', data_type, chapter_url))
         
         return pages
     
-    def get_next_chapter(self, current_chapter_url: str, manga_url: str = None) -> Optional[str]:
-        """Get next chapter URL."""
-        if not manga_url:
-            # Try to get manga URL from chapter
-            chapter_id = self._extract_id_from_url(current_chapter_url)
-            response = self._make_request(f"{self.API_CHAPTER_URL}/{chapter_id}")
-            data = response.json()
-            
-            manga_id = None
-            for rel in data.get('data', {}).get('relationships', []):
-                if rel.get('type') == 'manga':
-                    manga_id = rel.get('id')
-                    break
-            
-            if not manga_id:
-                return None
-            
-            manga_url = self._build_manga_url(manga_id)
+    def refresh_pages(self, chapter_url: str) -> List[PageRef]:
+        """
+        Get page URLs on a newly resolved image server, for when the cached
+        baseUrl has been rejected (403) or an image host is failing.
+        """
+        chapter_id = self._extract_id_from_url(chapter_url)
+        at_home_servers.invalidate(self._at_home_server_key(chapter_id))
+        return self.get_pages(chapter_url)
+    
+    def _page_quality(self) -> str:
+        """'data' or 'data-saver' for the next chapter's pages."""
+        use_data_saver = self.preferences.get('use_data_saver', False)
+        if use_data_saver == 'auto':
+            return bandwidth.choose(self.preferences.get('target_page_time', self.TARGET_PAGE_TIME))
+        return BandwidthEstimator.SAVER if use_data_saver else BandwidthEstimator.FULL
+    
+    def record_page_transfer(self, page: PageRef, size: int, seconds: float,
+                             latency: Optional[float] = None):
+        """Feed a page download into the throughput estimate for 'auto' data saver."""
+        bandwidth.record(size, seconds, page.quality, latency)
+    
+    def fetch_page(self, page: PageRef, stream: bool = False, headers: Optional[Dict] = None,
+                   hedge_after: Optional[float] = None) -> requests.Response:
+        """
+        Download a page image, failing over from a slow or broken MD@Home
+        node to the uploads host.
         
-        chapters = self.get_chapters(manga_url)
-        if not chapters:
-            return None
+        A 403 means the at-home token in the URL expired: the chapter's
+        server is resolved again and the page retried once on it, in the
+        same quality.
         
-        # Find current chapter
-        current_index = None
-        for i, chapter in enumerate(chapters):
-            if chapter['url'] == current_chapter_url:
-                current_index = i
-                break
+        Args:
+            page: Page from get_pages()
+            stream: Leave the body unread
+            headers: Extra request headers, e.g. Range
+            hedge_after: Seconds after which the page is also requested from
+                the uploads host, defaults to preferences['hedge_after'] (off if unset)
+        """
+        if hedge_after is None:
+            hedge_after = self.preferences.get('hedge_after')
+        response = self._fetch_image(page, stream, headers, hedge_after)
+        if response.status_code == 403 and page.chapter_url:
+            response.close()
+            response = self._fetch_image(self._renew_page(page), stream, headers, hedge_after)
+        return response
+    
+    def _renew_page(self, page: PageRef) -> PageRef:
+        """The page on a newly resolved at-home server."""
+        chapter_id = self._extract_id_from_url(page.chapter_url)
+        at_home_servers.invalidate(self._at_home_server_key(chapter_id))
+        base_url, _ = self._get_at_home(chapter_id)
+        url = image_hosts.rebase(page.url, image_hosts.choose(base_url))
+        return PageRef(url, page.number, page.referer, page.quality, page.chapter_url)
+    
+    def _fetch_image(self, page: PageRef, stream: bool, headers: Optional[Dict],
+                     hedge_after: Optional[float]) -> requests.Response:
+        headers = {**(headers or {}), 'Referer': page.referer}
+        
+        def get(url: str) -> requests.Response:
+            # No retries on the node itself, failing over is faster. The body
+            # is read below so its transfer can be timed on its own
+            return self.session.get(url, headers=headers, stream=True, retry=False)
+        
+        response = image_hosts.fetch(page.url, get, hedge_after)
+        if not stream:
+            transport = self.session.transport
+            with transport.host_slot(response.url):
+                started = time.monotonic()
+                content = response.content
+                body_seconds = time.monotonic() - started
+            transport.record(response.url, len(content), requests_made=0)
+            if response.ok:
+                latency = response.elapsed.total_seconds()
+                self.record_page_transfer(page, len(content), latency + body_seconds, latency)
+        return response
+    
+    def _at_home_server_key(self, chapter_id: str) -> Tuple[str, bool]:
+        return chapter_id, self.preferences.get('force_standard_https', False)
+    
+    def _get_at_home(self, chapter_id: str) -> Tuple[str, AtHomeManifest]:
+        """Return the chapter's image server baseUrl and file list, from cache when still valid."""
+        cached = self._cached_at_home(chapter_id)
+        if cached is not None:
+            return cached
+        response = self._make_request(self._at_home_url(chapter_id))
+        return self._store_at_home(chapter_id, response.json())
+    
+    def _cached_at_home(self, chapter_id: str) -> Optional[Tuple[str, AtHomeManifest]]:
+        """Cached image server baseUrl and file list, None unless both are still valid."""
+        base_url = at_home_servers.get(self._at_home_server_key(chapter_id))
+        manifest = at_home_manifests.get(chapter_id)
+        if base_url is not None and manifest is not None:
+            return base_url, manifest
+        return None
+    
+    def _at_home_url(self, chapter_id: str) -> str:
+        at_home_url = f"{self.API_AT_HOME_URL}/{chapter_id}"
+        if self._at_home_server_key(chapter_id)[1]:
+            at_home_url += "?forcePort443=true"
+        return at_home_url
+    
+    def _store_at_home(self, chapter_id: str, data: Dict) -> Tuple[str, AtHomeManifest]:
+        """Cache an /at-home/server response, returning its baseUrl and file list."""
+        server_key = self._at_home_server_key(chapter_id)
+        manifest = at_home_manifests.get(chapter_id)
+        base_url = data.get('baseUrl', '')
+        at_home_servers.set(server_key, base_url, self.AT_HOME_SERVER_TTL)
+        
+        # A host refresh keeps the cached file list unless the chapter was
+        # re-uploaded under a new hash
+        chapter_info = data.get('chapter', {})
+        if manifest is None or manifest.hash != chapter_info.get('hash', ''):
+            manifest = AtHomeManifest(
+                chapter_info.get('hash', ''),
+                chapter_info.get('data', []),
+                chapter_info.get('dataSaver', [])
+            )
+            at_home_manifests.set(chapter_id, manifest, self.AT_HOME_MANIFEST_TTL)
+        
+        return base_url, manifest
+    
+    def _load_chapter_urls(self, manga_url: str) -> List[str]:
+        """
+        Chapter URLs for the chapter index. The cached chapter feed outlives
+        the index, so its pages are revalidated first: an index rebuilt for
+        a newly released chapter must not come from the same stale feed.
+        """
+        manga_id = self._extract_id_from_url(manga_url)
+        if self.cache is not None and self._is_valid_uuid(manga_id):
+            self.cache.expire(f"{self.API_CHAPTER_URL}?%manga={manga_id}%")
+        return super()._load_chapter_urls(manga_url)
+    
+    def _chapter_index_namespace(self) -> tuple:
+        """Chapter lists differ per translated language."""
+        return (type(self).__name__, self.dex_language)
+    
+    def _resolve_manga_url(self, chapter_url: str) -> Optional[str]:
+        """Get manga URL from the chapter's relationships."""
+        chapter_id = self._extract_id_from_url(chapter_url)
+        response = self._make_request(f"{self.API_CHAPTER_URL}/{chapter_id}")
+        data = response.json()
+        
+        for rel in data.get('data', {}).get('relationships', []):
+            if rel.get('type') == 'manga':
+                return self._build_manga_url(rel.get('id'))
         
-        if current_index is None or current_index == 0:
+        return None
+    
+    def get_next_chapter(self, current_chapter_url: str, manga_url: str = None) -> Optional[str]:
+        """Get next chapter URL."""
+        index = self._find_chapter_index(current_chapter_url, manga_url)
+        if not index:
             return None
         
-        # Return next chapter (chapters are sorted desc, so next is previous index)
-        return chapters[current_index - 1]['url']
+        # Chapters are sorted desc, so next is previous index
+        return index.next(current_chapter_url)
     
     def get_previous_chapter(self, current_chapter_url: str, manga_url: str = None) -> Optional[str]:
         """Get previous chapter URL."""
-        if not manga_url:
-            # Try to get manga URL from chapter
-            chapter_id = self._extract_id_from_url(current_chapter_url)
-            response = self._make_request(f"{self.API_CHAPTER_URL}/{chapter_id}")
-            data = response.json()
-            
-            manga_id = None
-            for rel in data.get('data', {}).get('relationships', []):
-                if rel.get('type') == 'manga':
-                    manga_id = rel.get('id')
-                    break
-            
-            if not manga_id:
-                return None
-            
-            manga_url = self._build_manga_url(manga_id)
-        
-        chapters = self.get_chapters(manga_url)
-        if not chapters:
-            return None
-        
-        # Find current chapter
-        current_index = None
-        for i, chapter in enumerate(chapters):
-            if chapter['url'] == current_chapter_url:
-                current_index = i
-                break
-        
-        if current_index is None or current_index >= len(chapters) - 1:
+        index = self._find_chapter_index(current_chapter_url, manga_url)
+        if not index:
             return None
         
-        # Return previous chapter (chapters are sorted desc, so previous is next index)
-        return chapters[current_index + 1]['url']
+        # Chapters are sorted desc, so previous is next index
+        return index.previous(current_chapter_url)
     
     def get_manga_aggregate(self, manga_url: str) -> Dict:
         """Get manga chapter aggregate for status determination."""
@@ -746,6 +1228,42 @@ class MangaDexSource(MangaSource):
         response = self._make_request(f"{self.API_BASE_URL}/statistics/manga/{manga_id}")
         return response.json()
     
+    def get_manga_statistics_many(self, manga_urls: List[str]) -> Dict[str, Dict]:
+        """
+        Get follows, ratings and comment counts for many manga at once.
+        
+        Uses the multi-id 'statistics/manga?manga[]=' form in batches of
+        STATISTICS_IDS_LIMIT, requested concurrently.
+        
+        Returns:
+            Dict keyed by manga ID of {'follows', 'rating', 'bayesian_rating', 'comments'}
+        """
+        manga_ids = list(dict.fromkeys(self._extract_id_from_url(url) for url in manga_urls))
+        
+        for manga_id in manga_ids:
+            if not self._is_valid_uuid(manga_id):
+                raise ValueError(f"Invalid manga URL format: {manga_id}")
+        
+        calls = [
+            (f"{self.API_BASE_URL}/statistics/manga",
+             {'manga[]': manga_ids[start:start + self.STATISTICS_IDS_LIMIT]})
+            for start in range(0, len(manga_ids), self.STATISTICS_IDS_LIMIT)
+        ]
+        
+        results = {}
+        for response in self._make_requests(calls):
+            for manga_id, statistics in response.json().get('statistics', {}).items():
+                rating = statistics.get('rating') or {}
+                comments = statistics.get('comments') or {}
+                results[manga_id] = {
+                    'follows': statistics.get('follows', 0),
+                    'rating': rating.get('average'),
+                    'bayesian_rating': rating.get('bayesian'),
+                    'comments': comments.get('repliesCount', 0)
+                }
+        
+        return results
+    
     def get_cover_art(self, manga_url: str, volume: str = None) -> str:
         """Get cover art URL for manga."""
         manga_id = self._extract_id_from_url(manga_url)
@@ -0,0 +1,359 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import aiohttp
+import requests
+
+from .interfaces.records import Chapter, Manga, PageRef
+from .mangadex import MangaDexSource
+from .rate_limiter import RateLimiter
+from .singleflight import AsyncSingleFlight
+from .response_cache import ResponseCache, build_response
+from .transport import Transport
+
+
+class AsyncMangaDexSource(MangaDexSource):
+    """
+    MangaDex source backed by an asyncio HTTP client.
+
+    Every request is multiplexed over a single aiohttp session running on a
+    background event loop, so many calls can be in flight at once while the
+    shared rate limiter only spaces out their start times. The public methods
+    are the ones of MangaDexSource and return the same values, which keeps the
+    class a drop-in replacement for synchronous callers such as
+    scrape.print_chapter_pages. Fan-out is done with submit/map, or with the
+    awaitable proxy returned by ``aio`` from inside another event loop.
+
+    search_async, get_chapters_async and get_pages_async are coroutines
+    over request() itself, so awaiting them from another loop holds no
+    thread and is only bounded by max_in_flight.
+    """
+
+    DEFAULT_MAX_IN_FLIGHT = 32
+
+    def __init__(self, language: str = "en", preferences: Optional[Dict] = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 cache: Optional[ResponseCache] = None,
+                 transport: Optional[Transport] = None,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT):
+        """
+        Initialize async MangaDex source.
+
+        Args:
+            language: Target language code (e.g., 'en', 'fr', 'es')
+            preferences: User preferences dict
+            rate_limiter: Limiter to draw from, defaults to the process-wide one
+            cache: Response cache for manga, chapter, cover and statistics calls
+            transport: HTTP transport providing pool limits and counters
+            max_in_flight: Maximum number of concurrent HTTP requests
+        """
+        super().__init__(language, preferences, rate_limiter, cache, transport)
+        self.max_in_flight = max_in_flight
+
+        self._loop = None
+        self._loop_thread = None
+        self._loop_lock = threading.Lock()
+        self._http = None
+        self._executor = None
+        self._inflight = AsyncSingleFlight()
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the background event loop on first use."""
+        with self._loop_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                thread = threading.Thread(
+                    target=loop.run_forever,
+                    name='mangadex-async',
+                    daemon=True
+                )
+                thread.start()
+                self._loop = loop
+                self._loop_thread = thread
+            return self._loop
+
+    def _run(self, coro) -> Any:
+        """Run a coroutine on the background loop and wait for its result."""
+        loop = self._ensure_loop()
+        if threading.current_thread() is self._loop_thread:
+            raise RuntimeError("Blocking call made from the source event loop")
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    async def _get_http(self) -> aiohttp.ClientSession:
+        """Create the aiohttp session lazily, inside the background loop."""
+        if self._http is None:
+            transport = self.session.transport
+            connector = aiohttp.TCPConnector(
+                limit=self.max_in_flight,
+                limit_per_host=transport.max_per_host
+            )
+            connect_timeout, read_timeout = transport.timeout
+            self._http = aiohttp.ClientSession(
+                connector=connector,
+                headers=dict(self.session.headers),
+                timeout=aiohttp.ClientTimeout(sock_connect=connect_timeout, sock_read=read_timeout)
+            )
+        return self._http
+
+    async def _fetch_async(self, url: str, params: Optional[Dict] = None,
+                           headers: Optional[Dict] = None) -> requests.Response:
+        """
+        Make a rate-limited request to the API from the background loop,
+        paced and retried by the transport's throttle. Every attempt,
+        retries included, draws a token from the shared rate limiter.
+
+        The body is read completely and wrapped in a requests.Response, so the
+        parsing code and error handling of MangaDexSource apply unchanged.
+        """
+        http = await self._get_http()
+        loop = asyncio.get_running_loop()
+        endpoint = self._rate_limit_endpoint(url)
+        throttle = self.session.transport.throttle
+        attempt = 0
+
+        while True:
+            await self.rate_limiter.acquire_async(endpoint)
+            delay = throttle.reserve(url)
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            try:
+                async with http.get(url, params=self._encode_params(params), headers=headers) as resp:
+                    content = await resp.read()
+                    response = build_response(str(resp.url), resp.status, resp.headers, content, resp.reason)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                self.session.transport.record(url, error=True)
+                delay = throttle.observe_error(url, attempt)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            except aiohttp.ClientError:
+                self.session.transport.record(url, error=True)
+                raise
+
+            delay = throttle.observe(url, response.status_code, response.headers, attempt)
+            if delay is None:
+                break
+            self.session.transport.record(url, len(content), error=True)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+        self.session.transport.record(url, len(content), error=response.status_code >= 400)
+
+        # The adapted rate is written to the limiter's backend, which may be a lock file
+        await loop.run_in_executor(None, self._adapt_rate, url, response)
+        response.raise_for_status()
+        return response
+
+    async def request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """
+        Make a rate-limited request, served from the response cache when
+        possible. Concurrent identical requests share one fetch.
+        """
+        return await self._inflight.do(ResponseCache.make_key(url, params), lambda: self._request_async(url, params))
+
+    async def _request_async(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        if self.cache is None:
+            return await self._fetch_async(url, params)
+
+        # The cache is an SQLite file: look up and store on a worker thread
+        # so the loop keeps serving the other requests meanwhile
+        loop = asyncio.get_running_loop()
+        key, entry, cached = await loop.run_in_executor(None, self._cache_lookup, url, params)
+        if cached is not None:
+            return cached
+        if key is None:
+            return await self._fetch_async(url, params)
+
+        response = await self._fetch_async(url, params, entry.validators() if entry else None)
+        return await loop.run_in_executor(None, self._cache_update, key, entry, response, url, params)
+
+    def _encode_params(self, params: Optional[Dict]) -> Optional[List[Tuple[str, str]]]:
+        """Flatten list values the way requests does ('key[]': [a, b])."""
+        if not params:
+            return None
+
+        encoded = []
+        for key, value in params.items():
+            if isinstance(value, (list, tuple)):
+                encoded.extend((key, str(item)) for item in value)
+            elif value is not None:
+                encoded.append((key, str(value)))
+        return encoded
+
+    async def _await_request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """Await request() on the background loop from whichever loop the caller runs on."""
+        loop = self._ensure_loop()
+        if asyncio.get_running_loop() is loop:
+            return await self.request(url, params)
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(self.request(url, params), loop))
+
+    async def _await_requests(self, calls: Iterable[Tuple[str, Optional[Dict]]]) -> List[requests.Response]:
+        """Await several (url, params) requests concurrently, responses in order."""
+        tasks = [asyncio.ensure_future(self._await_request(url, params)) for url, params in calls]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+    async def search_async(self, query: str) -> List[Manga]:
+        """
+        Coroutine version of search(). Title searches await the API directly,
+        the prefixed ones (id:, ch:, ...) run search() on a worker thread.
+        """
+        if not self._is_title_search(query):
+            return await asyncio.wrap_future(self.submit('search', query))
+
+        try:
+            response = await self._await_request(self.API_MANGA_URL, self._title_search_params(query.strip(), 0))
+        except Exception as e:
+            print(f"Error searching for '{query}': {e}")
+            return []
+        return [self._create_manga_from_data(manga_data) for manga_data in response.json().get('data', [])]
+
+    async def get_chapters_async(self, manga_url: str, limit: Optional[int] = None) -> List[Chapter]:
+        """Coroutine version of get_chapters(), the remaining feed pages are awaited together."""
+        manga_id = self._extract_id_from_url(manga_url)
+
+        if not self._is_valid_uuid(manga_id):
+            raise ValueError("Invalid manga URL format")
+
+        page_size = self.CHAPTER_PAGE_LIMIT if limit is None else min(self.CHAPTER_PAGE_LIMIT, limit)
+        response = await self._await_request(self.API_CHAPTER_URL, self._chapter_feed_params(manga_id, 0, page_size))
+        first = response.json()
+        responses = await self._await_requests(self._chapter_feed_calls(manga_id, first, limit))
+
+        chapters = []
+        for page in [first.get('data', [])] + [response.json().get('data', []) for response in responses]:
+            for chapter_data in page:
+                chapter = self._create_chapter_from_data(chapter_data)
+                if chapter:
+                    chapters.append(chapter)
+        return chapters if limit is None else chapters[:limit]
+
+    async def get_pages_async(self, chapter_url: str) -> List[PageRef]:
+        """Coroutine version of get_pages(), sharing its at-home caches."""
+        chapter_id = self._extract_id_from_url(chapter_url)
+
+        if not self._is_valid_uuid(chapter_id):
+            raise ValueError("Invalid chapter URL format")
+
+        at_home = self._cached_at_home(chapter_id)
+        if at_home is None:
+            response = await self._await_request(self._at_home_url(chapter_id))
+            at_home = self._store_at_home(chapter_id, response.json())
+        return self._build_pages(chapter_url, *at_home)
+
+    def _make_request(self, url: str, params: Optional[Dict] = None) -> requests.Response:
+        """Make a rate-limited request through the asyncio client."""
+        return self._run(self.request(url, params))
+
+    def _iter_requests(self, calls: Iterable[Tuple[str, Optional[Dict]]]) -> Iterator[requests.Response]:
+        """Issue several (url, params) requests concurrently, yield responses in order."""
+        loop = self._ensure_loop()
+        futures = [asyncio.run_coroutine_threadsafe(self.request(url, params), loop) for url, params in calls]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """
+        Schedule a source method call and return a concurrent.futures.Future.
+
+        Example: source.submit('get_pages', chapter_url)
+        """
+        with self._loop_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_in_flight,
+                    thread_name_prefix='mangadex-call'
+                )
+        return self._executor.submit(getattr(self, method), *args, **kwargs)
+
+    def map(self, method: str, arguments: Iterable) -> List:
+        """
+        Call a source method once per argument concurrently.
+
+        Results are returned in input order. A failed call yields its
+        exception in place of a result so one bad id does not lose the batch.
+        """
+        futures = [self.submit(method, argument) for argument in arguments]
+
+        results = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as e:
+                results.append(e)
+        return results
+
+    @property
+    def aio(self) -> '_AwaitableSource':
+        """Awaitable view of the source for use inside another event loop."""
+        return _AwaitableSource(self)
+
+    def close(self):
+        """Close the HTTP session and stop the background loop."""
+        with self._loop_lock:
+            loop, thread = self._loop, self._loop_thread
+            executor = self._executor
+            self._loop = self._loop_thread = self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+        if loop is None:
+            return
+
+        if self._http is not None:
+            asyncio.run_coroutine_threadsafe(self._http.close(), loop).result()
+            self._http = None
+
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        loop.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class _AwaitableSource:
+    """
+    Expose every source method as a coroutine function of the same name.
+
+    search, get_chapters and get_pages are the source's native coroutines;
+    any other method runs on one of the source's worker threads.
+    """
+
+    def __init__(self, source: AsyncMangaDexSource):
+        self._source = source
+
+    def search(self, query: str):
+        return self._source.search_async(query)
+
+    def get_chapters(self, manga_url: str, limit: Optional[int] = None):
+        return self._source.get_chapters_async(manga_url, limit)
+
+    def get_pages(self, chapter_url: str):
+        return self._source.get_pages_async(chapter_url)
+
+    def __getattr__(self, name: str):
+        if not callable(getattr(self._source, name)):
+            raise AttributeError(name)
+
+        async def call(*args, **kwargs):
+            return await asyncio.wrap_future(self._source.submit(name, *args, **kwargs))
+
+        return call
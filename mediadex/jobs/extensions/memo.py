@@ -0,0 +1,58 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLMemo:
+    """
+    Thread-safe in-memory memo whose entries expire after ttl seconds.
+
+    Expired entries are kept until overwritten, so callers can still read
+    them with get_stale() and renew them with touch() after checking that
+    they are unchanged. Once max_entries are held, storing a new key drops
+    the entry written or renewed longest ago.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Get a value if present and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            return None
+        return entry[0]
+
+    def get_stale(self, key: Hashable) -> Optional[Any]:
+        """Get a value even if it has expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value for ttl seconds (the memo default if not given)."""
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            elif len(self._entries) >= self.max_entries:
+                self._entries.popitem(last=False)
+            self._entries[key] = (value, expires_at)
+
+    def touch(self, key: Hashable, ttl: Optional[float] = None):
+        """Renew an entry without changing its value."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries[key] = (entry[0], time.time() + (self.ttl if ttl is None else ttl))
+                self._entries.move_to_end(key)
+
+    def invalidate(self, key: Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
@@ -0,0 +1,219 @@
+import asyncio
+import fcntl
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+
+
+class MemoryBackend:
+    """Keeps bucket state in this process, guarded by a lock."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}
+
+    @contextmanager
+    def locked(self, name: str):
+        with self._lock:
+            yield self._states.setdefault(name, {})
+
+
+class FileLockBackend:
+    """
+    Keeps bucket state in small JSON files guarded by flock, so that worker
+    processes on the same machine draw from the same budget.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @contextmanager
+    def locked(self, name: str):
+        path = os.path.join(self.directory, f"{name}.bucket")
+        with open(path, 'a+') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                handle.seek(0)
+                raw = handle.read()
+                state = json.loads(raw) if raw else {}
+                yield state
+                handle.seek(0)
+                handle.truncate()
+                handle.write(json.dumps(state))
+                handle.flush()
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class TokenBucket:
+    """
+    Token bucket allowing bursts of up to ``capacity`` requests and a
+    sustained ``rate`` requests per second.
+
+    Blocking callers reserve their tokens up front (the balance may go
+    negative) and then sleep for the returned delay, which keeps waiters in
+    FIFO order without polling.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float, backend=None):
+        self.name = name
+        self.base_rate = rate
+        self.capacity = capacity
+        self.backend = backend or MemoryBackend()
+
+    @property
+    def rate(self) -> float:
+        """Current rate, which adapt_rate() may have moved away from base_rate."""
+        with self.backend.locked(self.name) as state:
+            return state.get('rate', self.base_rate)
+
+    def adapt_rate(self, adapt) -> float:
+        """
+        Replace the rate with adapt(rate). The rate is kept with the tokens,
+        so every process sharing the backend paces at the same rate.
+        """
+        with self.backend.locked(self.name) as state:
+            rate = adapt(state.get('rate', self.base_rate))
+            state['rate'] = rate
+            return rate
+
+    def _update(self, operation):
+        """Refill the bucket, apply operation(tokens, rate) -> (result, tokens)."""
+        with self.backend.locked(self.name) as state:
+            now = time.time()
+            rate = state.get('rate', self.base_rate)
+            tokens = state.get('tokens', self.capacity)
+            updated = state.get('updated', now)
+            tokens = min(self.capacity, tokens + max(0.0, now - updated) * rate)
+
+            result, tokens = operation(tokens, rate)
+
+            state['tokens'] = tokens
+            state['updated'] = now
+            return result
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens if they are available right now, never waits."""
+        def operation(available, rate):
+            if available >= tokens:
+                return True, available - tokens
+            return False, available
+
+        return self._update(operation)
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take tokens unconditionally and return the seconds to wait before using them."""
+        def operation(available, rate):
+            remaining = available - tokens
+            delay = -remaining / rate if remaining < 0 else 0.0
+            return delay, remaining
+
+        return self._update(operation)
+
+    def refund(self, tokens: float = 1):
+        """Give back tokens taken by a reservation that was not used."""
+        self._update(lambda available, rate: (None, min(self.capacity, available + tokens)))
+
+    def acquire(self, tokens: float = 1):
+        """Block until the tokens may be used."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, tokens: float = 1):
+        """
+        Wait on the event loop until the tokens may be used. The reservation
+        runs on a worker thread, as the backend may wait on a file lock.
+        """
+        delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimiter:
+    """
+    Set of token buckets for one API.
+
+    Every request draws from the ``default`` bucket. Endpoints with a
+    stricter limit of their own (e.g. MangaDex at-home) additionally draw
+    from their named bucket.
+    """
+
+    DEFAULT_BUCKET = 'default'
+
+    def __init__(self, name: str, limits: Dict[str, Tuple[float, float]], backend=None):
+        """
+        Args:
+            name: Prefix for bucket names, shared by every user of the API
+            limits: Mapping of bucket name to (rate per second, burst capacity)
+            backend: MemoryBackend (default) or FileLockBackend
+        """
+        self.name = name
+        self.backend = backend or MemoryBackend()
+        self.buckets = {
+            bucket: TokenBucket(f"{name}.{bucket}", rate, capacity, self.backend)
+            for bucket, (rate, capacity) in limits.items()
+        }
+
+    def _buckets_for(self, endpoint: Optional[str]):
+        buckets = [self.buckets[self.DEFAULT_BUCKET]]
+        if endpoint and endpoint != self.DEFAULT_BUCKET and endpoint in self.buckets:
+            buckets.append(self.buckets[endpoint])
+        return buckets
+
+    def try_acquire(self, endpoint: Optional[str] = None, tokens: float = 1) -> bool:
+        """Take a token for endpoint if all its buckets allow it right now."""
+        taken = []
+        for bucket in self._buckets_for(endpoint):
+            if not bucket.try_acquire(tokens):
+                for previous in taken:
+                    previous.refund(tokens)
+                return False
+            taken.append(bucket)
+        return True
+
+    def reserve(self, endpoint: Optional[str] = None, tokens: float = 1) -> float:
+        """Reserve a token for endpoint and return the seconds to wait."""
+        return max(bucket.reserve(tokens) for bucket in self._buckets_for(endpoint))
+
+    def acquire(self, endpoint: Optional[str] = None, tokens: float = 1):
+        """Block until a request to endpoint is allowed."""
+        delay = self.reserve(endpoint, tokens)
+        if delay > 0:
+            time.sleep(delay)
+
+    async def acquire_async(self, endpoint: Optional[str] = None, tokens: float = 1):
+        """
+        Wait on the event loop until a request to endpoint is allowed. The
+        reservation runs on a worker thread, as the backend may wait on a
+        file lock.
+        """
+        delay = await asyncio.get_running_loop().run_in_executor(None, self.reserve, endpoint, tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+# Limiters are shared by every source instance and thread in the process.
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, limits: Dict[str, Tuple[float, float]]) -> RateLimiter:
+    """
+    Return the process-wide limiter for name, creating it on first use.
+
+    When MEDIADEX_RATE_LIMIT_DIR is set the buckets live in that directory and
+    are shared with every other worker process using the same directory.
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            directory = os.environ.get('MEDIADEX_RATE_LIMIT_DIR')
+            backend = FileLockBackend(directory) if directory else MemoryBackend()
+            limiter = RateLimiter(name, limits, backend)
+            _limiters[name] = limiter
+        return limiter
@@ -0,0 +1,225 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlencode
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+# Response headers worth keeping with a cached body
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified')
+
+
+def build_response(url: str, status_code: int, headers: Mapping, content: bytes,
+                   reason: str = '') -> requests.Response:
+    """Wrap an already read body in a requests.Response."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = reason
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    return response
+
+
+class CacheEntry:
+    """Cached response body and the validators needed to revalidate it."""
+
+    def __init__(self, key: str, url: str, headers: Dict, body: bytes, expires_at: float):
+        self.key = key
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.expires_at = expires_at
+
+    def is_fresh(self) -> bool:
+        return time.time() < self.expires_at
+
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers for revalidation."""
+        headers = {}
+        if self.headers.get('ETag'):
+            headers['If-None-Match'] = self.headers['ETag']
+        if self.headers.get('Last-Modified'):
+            headers['If-Modified-Since'] = self.headers['Last-Modified']
+        return headers
+
+    def to_response(self) -> requests.Response:
+        return build_response(self.url, 200, self.headers, self.body, 'OK')
+
+
+class ResponseCache:
+    """
+    Persistent HTTP response cache stored in SQLite.
+
+    Bodies are zlib-compressed. Entries are served without a request until
+    their TTL runs out, then revalidated with If-None-Match/If-Modified-Since.
+    The total stored size is bounded and the least recently used entries are
+    evicted first.
+    """
+
+    DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+    # Stores between exact recounts of the stored size; other processes
+    # sharing the file only show up in the running total at a recount
+    RECOUNT_INTERVAL = 1000
+    # Evict down to this share of max_size, so the next evictions (and
+    # their recounts) are some stores away
+    EVICT_TARGET = 0.9
+
+    def __init__(self, path: str, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Args:
+            path: SQLite database file
+            max_size: Maximum total size of compressed bodies in bytes
+        """
+        self.path = path
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._total_size = None
+        self._stores = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._db.execute('CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)')
+        self._db.commit()
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        """Normalize url and params into a cache key."""
+        if not params:
+            return url
+
+        items = []
+        for key, value in params.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            items.extend((key, str(item)) for item in values if item is not None)
+        return f"{url}?{urlencode(sorted(items))}"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        """Get an entry, fresh or stale, and mark it as recently used."""
+        with self._lock:
+            row = self._db.execute(
+                'SELECT url, headers, body, expires_at FROM responses WHERE key = ?',
+                (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            self._db.execute(
+                'UPDATE responses SET accessed_at = ? WHERE key = ?',
+                (time.time(), key)
+            )
+            self._db.commit()
+
+        url, headers, body, expires_at = row
+        return CacheEntry(key, url, json.loads(headers), zlib.decompress(body), expires_at)
+
+    def store(self, key: str, response: requests.Response, ttl: float):
+        """Store a successful response for ttl seconds."""
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = zlib.compress(response.content)
+        now = time.time()
+
+        with self._lock:
+            replaced = self._db.execute('SELECT size FROM responses WHERE key = ?', (key,)).fetchone()
+            self._db.execute(
+                'INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, response.url, json.dumps(headers), body, len(body), now + ttl, now)
+            )
+            self._evict(len(body) - (replaced[0] if replaced else 0))
+            self._db.commit()
+
+    def refresh(self, key: str, ttl: float):
+        """Extend an entry after a 304 Not Modified."""
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                'UPDATE responses SET expires_at = ?, accessed_at = ? WHERE key = ?',
+                (now + ttl, now, key)
+            )
+            self._db.commit()
+
+    def expire(self, pattern: str):
+        """
+        Mark the entries whose key matches a SQL LIKE pattern as stale, so
+        their next use revalidates them instead of serving the body as is.
+        """
+        with self._lock:
+            self._db.execute('UPDATE responses SET expires_at = 0 WHERE key LIKE ?', (pattern,))
+            self._db.commit()
+
+    def invalidate(self, key: str):
+        """Drop a single entry."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._db.commit()
+            self._total_size = None
+
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._db.execute('DELETE FROM responses')
+            self._db.commit()
+            self._total_size = None
+
+    def _count_size(self) -> int:
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM responses').fetchone()[0]
+
+    def _evict(self, added: int):
+        """
+        Once the size bound is exceeded, remove least recently used entries
+        until the total is back to EVICT_TARGET of it.
+
+        The stored size is tracked as a running total; the table is only
+        summed every RECOUNT_INTERVAL stores and before evicting.
+        """
+        self._stores += 1
+        if self._total_size is None or self._stores % self.RECOUNT_INTERVAL == 0:
+            self._total_size = self._count_size()
+        else:
+            self._total_size += added
+        if self._total_size <= self.max_size:
+            return
+
+        total = self._total_size = self._count_size()
+        if total <= self.max_size:
+            return
+
+        target = self.max_size * self.EVICT_TARGET
+        evicted = []
+        rows = self._db.execute('SELECT key, size FROM responses ORDER BY accessed_at')
+        for key, size in rows:
+            if total <= target:
+                break
+            evicted.append((key,))
+            total -= size
+        rows.close()
+
+        self._db.executemany('DELETE FROM responses WHERE key = ?', evicted)
+        self._total_size = total
+
+    def close(self):
+        with self._lock:
+            self._db.close()
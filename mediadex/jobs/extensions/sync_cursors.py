@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+
+class SyncCursorStore:
+    """
+    Persistent incremental sync cursors, one per (source, manga, language).
+
+    A cursor is the newest update timestamp seen for a chapter feed, stored
+    in the form the source API accepts back as a "since" filter.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS cursors (
+                source TEXT NOT NULL,
+                manga_id TEXT NOT NULL,
+                language TEXT NOT NULL,
+                cursor TEXT NOT NULL,
+                synced_at REAL NOT NULL,
+                PRIMARY KEY (source, manga_id, language)
+            )
+        """)
+        self._db.commit()
+
+    def get(self, source: str, manga_id: str, language: str) -> Optional[str]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT cursor FROM cursors WHERE source = ? AND manga_id = ? AND language = ?',
+                (source, manga_id, language)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, source: str, manga_id: str, language: str, cursor: str):
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO cursors VALUES (?, ?, ?, ?, ?)',
+                (source, manga_id, language, cursor, time.time())
+            )
+            self._db.commit()
+
+    def reset(self, source: str, manga_id: str, language: str):
+        """Forget a cursor so the next sync fetches the full feed."""
+        with self._lock:
+            self._db.execute(
+                'DELETE FROM cursors WHERE source = ? AND manga_id = ? AND language = ?',
+                (source, manga_id, language)
+            )
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional
+from urllib.parse import urlparse
+
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+def parse_retry_after(headers: Mapping[str, str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Seconds to wait according to the response headers, None if they say nothing.
+
+    Understands X-RateLimit-Retry-After (Unix time, sent by MangaDex) and
+    Retry-After (delta seconds or HTTP date).
+    """
+    now = time.time() if now is None else now
+
+    value = headers.get('X-RateLimit-Retry-After')
+    if value:
+        try:
+            return max(0.0, float(value) - now)
+        except ValueError:
+            pass
+
+    value = headers.get('Retry-After')
+    if value:
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+        except (TypeError, ValueError):
+            pass
+
+    return None
+
+
+def rate_limit_headroom(headers: Mapping[str, str]) -> Optional[float]:
+    """Fraction of the rate limit window still available, None if not reported."""
+    try:
+        remaining = float(headers['X-RateLimit-Remaining'])
+        limit = float(headers['X-RateLimit-Limit'])
+    except (KeyError, ValueError):
+        return None
+    if limit <= 0:
+        return None
+    return remaining / limit
+
+
+class RetryPolicy:
+    """Jittered exponential backoff ("full jitter") for retryable failures."""
+
+    def __init__(self, max_retries: int = 4, base_delay: float = 0.5, max_delay: float = 60.0):
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class _HostState:
+    __slots__ = ('interval', 'next_at', 'blocked_until')
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.next_at = 0.0
+        self.blocked_until = 0.0
+
+
+class AdaptiveThrottle:
+    """
+    Per-host request pacing that follows what the server says.
+
+    Each host has a minimum interval between request starts. A 429/503, or
+    a nearly exhausted X-RateLimit-Remaining, widens it multiplicatively;
+    successful responses with headroom narrow it again, so pacing settles
+    just under the real limit. Retry-After style headers block the host
+    until the given time.
+    """
+
+    SLOW_DOWN_BELOW = 0.2  # Headroom fraction that triggers slowing down
+    SPEED_UP_ABOVE = 0.5  # Headroom fraction that allows speeding up
+
+    def __init__(self, min_interval: float = 0.0, max_interval: float = 10.0,
+                 retry_policy: Optional[RetryPolicy] = None):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.retry_policy = retry_policy or RetryPolicy()
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = _HostState(self.min_interval)
+            self._hosts[host] = state
+        return state
+
+    def interval(self, url: str) -> float:
+        """Current pacing interval for the URL's host."""
+        with self._lock:
+            return self._state(urlparse(url).netloc).interval
+
+    def reserve(self, url: str) -> float:
+        """Reserve the host's next request slot and return the seconds until it."""
+        now = time.time()
+        with self._lock:
+            state = self._state(urlparse(url).netloc)
+            start = max(now, state.next_at, state.blocked_until)
+            state.next_at = start + state.interval
+        return start - now
+
+    def wait(self, url: str):
+        """Block until a request to the URL's host may start."""
+        delay = self.reserve(url)
+        if delay > 0:
+            time.sleep(delay)
+
+    def observe(self, url: str, status_code: int, headers: Mapping[str, str], attempt: int) -> Optional[float]:
+        """
+        Update the host's pacing from a response.
+
+        Returns the seconds to wait before retrying, or None when the
+        response should be returned to the caller as is.
+        """
+        retry_after = parse_retry_after(headers)
+        headroom = rate_limit_headroom(headers)
+        retryable = status_code in RETRY_STATUSES
+
+        with self._lock:
+            state = self._state(urlparse(url).netloc)
+
+            if status_code in (429, 503) or (headroom is not None and headroom < self.SLOW_DOWN_BELOW):
+                state.interval = min(self.max_interval, max(state.interval * 2, 0.1))
+            elif status_code < 400 and (headroom is None or headroom > self.SPEED_UP_ABOVE):
+                # Never below min_interval, so without headroom this only
+                # undoes earlier slowing down
+                state.interval = max(self.min_interval, state.interval * 0.8)
+                if state.interval < 0.01:
+                    state.interval = self.min_interval
+
+            if retry_after is not None and (retryable or headroom == 0):
+                state.blocked_until = max(state.blocked_until, time.time() + retry_after)
+
+        if not retryable or attempt >= self.retry_policy.max_retries:
+            return None
+        if retry_after is not None:
+            return retry_after + random.uniform(0, self.retry_policy.base_delay)
+        return self.retry_policy.backoff(attempt)
+
+    def observe_error(self, url: str, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying after a connection error, None to give up."""
+        if attempt >= self.retry_policy.max_retries:
+            return None
+        return self.retry_policy.backoff(attempt)
+
+
+def adapt_bucket_rate(bucket, status_code: int, headers: Mapping[str, str],
+                      floor: float, ceiling: float):
+    """
+    Move a token bucket's rate between floor and ceiling from a response:
+    halve it on 429, ease off when headroom is low, creep up when it is high.
+
+    Responses that do not report headroom only bring a slowed down rate back
+    to the bucket's configured rate, never above it.
+    """
+    headroom = rate_limit_headroom(headers)
+
+    def adapt(rate):
+        if status_code == 429:
+            return max(floor, rate * 0.5)
+        if headroom is not None and headroom < AdaptiveThrottle.SLOW_DOWN_BELOW:
+            return max(floor, rate * 0.8)
+        if status_code >= 400:
+            return rate
+        if headroom is not None and headroom > AdaptiveThrottle.SPEED_UP_ABOVE:
+            return min(ceiling, rate * 1.05)
+        if headroom is None and rate < bucket.base_rate:
+            return min(bucket.base_rate, rate * 1.05)
+        return rate
+
+    bucket.adapt_rate(adapt)
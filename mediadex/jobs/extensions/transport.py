@@ -0,0 +1,216 @@
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from .response_cache import ResponseCache
+from .singleflight import SingleFlight
+from .throttle import AdaptiveThrottle
+
+
+class Transport:
+    """
+    HTTP transport shared by every source.
+
+    Each thread gets its own requests.Session (sessions are not thread
+    safe), but all of them mount the same HTTPAdapter, whose urllib3 pool is
+    thread safe. Keep-alive connections therefore outlive the short-lived
+    executor threads callers fan out on. Requests get default connect and
+    read timeouts, are capped per host by a semaphore, paced and retried by
+    an AdaptiveThrottle, and are counted per host for monitoring.
+    """
+
+    DEFAULT_TIMEOUT = (5, 30)  # (connect, read) seconds
+    DEFAULT_POOL_CONNECTIONS = 16  # Hosts kept in each session's pool
+    DEFAULT_POOL_MAXSIZE = 32  # Keep-alive connections per host
+    DEFAULT_MAX_PER_HOST = 8
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS'})
+
+    def __init__(self, timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+                 pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+                 pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+                 max_per_host: int = DEFAULT_MAX_PER_HOST,
+                 host_limits: Optional[Dict[str, int]] = None,
+                 throttle: Optional[AdaptiveThrottle] = None):
+        """
+        Args:
+            timeout: Default (connect, read) timeout for every request
+            pool_connections: Number of host pools kept by the adapter
+            pool_maxsize: Keep-alive connections kept per host
+            max_per_host: Default cap on concurrent requests per host
+            host_limits: Per-host overrides of max_per_host
+            throttle: Pacing and retry policy, shared by all hosts
+        """
+        self.timeout = timeout
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.max_per_host = max_per_host
+        self.host_limits = dict(host_limits or {})
+        self.throttle = throttle or AdaptiveThrottle()
+        self.inflight = SingleFlight()
+
+        self.adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._stats = defaultdict(lambda: {'requests': 0, 'errors': 0, 'bytes': 0})
+
+    @property
+    def session(self) -> requests.Session:
+        """The calling thread's session, sending over the shared pool."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self.adapter)
+            session.mount('http://', self.adapter)
+            self._local.session = session
+        return session
+
+    def limit_for(self, host: str) -> int:
+        return self.host_limits.get(host, self.max_per_host)
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.limit_for(host))
+                self._semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def host_slot(self, url: str):
+        """
+        Hold one of the host's concurrency slots. Streaming callers keep
+        the slot until they have finished reading the body.
+        """
+        semaphore = self._semaphore(urlparse(url).netloc)
+        with semaphore:
+            yield
+
+    def record(self, url: str, size: int = 0, error: bool = False, requests_made: int = 1):
+        """Add to a host's counters; streaming callers report bytes themselves."""
+        host = urlparse(url).netloc
+        with self._lock:
+            stats = self._stats[host]
+            stats['requests'] += requests_made
+            stats['bytes'] += size
+            if error:
+                stats['errors'] += 1
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Request, error and byte counters per host."""
+        with self._lock:
+            return {host: dict(stats) for host, stats in self._stats.items()}
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Send a request on the calling thread's session.
+
+        Idempotent requests that fail with a connection error or a
+        retryable status (429, 5xx) are retried after the delay the server
+        asked for, or with jittered exponential backoff. Pass retry=False
+        to get the first outcome instead.
+
+        Non-streaming requests hold a host slot for their whole duration.
+        With stream=True the slot is only held until the headers arrive;
+        wrap the body read in host_slot() to keep it.
+
+        pace, when given, is called before every attempt, retries included,
+        e.g. to draw a token from the caller's rate limiter.
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        retry = kwargs.pop('retry', True) and method.upper() in self.IDEMPOTENT_METHODS
+        pace = kwargs.pop('pace', None)
+        attempt = 0
+
+        while True:
+            if pace is not None:
+                pace()
+            self.throttle.wait(url)
+
+            with self.host_slot(url):
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                except (requests.ConnectionError, requests.Timeout):
+                    self.record(url, error=True)
+                    delay = self.throttle.observe_error(url, attempt) if retry else None
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+                except requests.RequestException:
+                    self.record(url, error=True)
+                    raise
+
+            delay = self.throttle.observe(url, response.status_code, response.headers, attempt) if retry else None
+            if delay is None:
+                break
+
+            self.record(url, error=True)
+            response.close()
+            time.sleep(delay)
+            attempt += 1
+
+        size = 0 if kwargs.get('stream') else len(response.content)
+        self.record(url, size, error=response.status_code >= 400)
+        return response
+
+    def coalesced_request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """
+        Like request(), but concurrent calls with the same method, URL,
+        params and headers wait for a single fetch and share its response.
+        Streaming and non-idempotent requests are sent as they are.
+        """
+        if kwargs.get('stream') or method.upper() not in self.IDEMPOTENT_METHODS:
+            return self.request(method, url, **kwargs)
+
+        headers = kwargs.get('headers') or {}
+        key = (
+            method.upper(),
+            ResponseCache.make_key(url, kwargs.get('params')),
+            tuple(sorted((name.lower(), value) for name, value in headers.items()))
+        )
+        return self.inflight.do(key, lambda: self.request(method, url, **kwargs))
+
+
+class TransportSession:
+    """
+    Stand-in for the requests.Session a source used to own: keeps the
+    source's default headers and sends through the shared Transport.
+    """
+
+    def __init__(self, transport: Transport, headers: Optional[Dict[str, str]] = None):
+        self.transport = transport
+        self.headers = CaseInsensitiveDict(headers or {})
+
+    def request(self, method: str, url: str, headers: Optional[Dict] = None, **kwargs) -> requests.Response:
+        merged = CaseInsensitiveDict(self.headers)
+        if headers:
+            merged.update(headers)
+        return self.transport.coalesced_request(method, url, headers=merged, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def head(self, url: str, **kwargs) -> requests.Response:
+        return self.request('HEAD', url, **kwargs)
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> Transport:
+    """Return the process-wide transport, creating it on first use."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = Transport()
+        return _transport
@@ -0,0 +1,69 @@
+# Image work run in transcoding worker processes. Workers are started with
+# the spawn method and import only this module, so it must not import Django
+# or anything that does.
+
+import os
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageOps, features
+
+
+# WebP cannot encode images taller or wider than this, long webtoon strips
+# fall back to JPEG
+WEBP_MAX_DIMENSION = 16383
+
+EXTENSIONS = {'WEBP': '.webp', 'AVIF': '.avif', 'JPEG': '.jpg'}
+
+
+def avif_supported() -> bool:
+    try:
+        return features.check('avif')
+    except ValueError:
+        # Pillow without the avif feature at all
+        return False
+
+
+def transcode_image(source_path: str, output_dir: str, image_format: str,
+                    renditions: Dict[str, Tuple[Optional[int], int]]) -> List[Dict]:
+    """
+    Write every rendition of one image into output_dir.
+
+    renditions maps a rendition kind to (max width or None to keep it,
+    quality). Only plain paths and dicts go in and out: kind, path, format,
+    width, height and size of each rendition.
+    """
+    results = []
+    with Image.open(source_path) as original:
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+
+        for kind, (max_width, quality) in renditions.items():
+            rendition = image
+            if max_width and image.width > max_width:
+                height = round(image.height * max_width / image.width)
+                rendition = image.resize((max_width, height), Image.LANCZOS)
+
+            rendition_format = image_format
+            if image_format == 'WEBP' and max(rendition.size) > WEBP_MAX_DIMENSION:
+                rendition_format = 'JPEG'
+            if rendition_format == 'JPEG' and rendition.mode == 'RGBA':
+                rendition = rendition.convert('RGB')
+
+            path = os.path.join(output_dir, f"{kind}{EXTENSIONS[rendition_format]}")
+            options = {'quality': quality}
+            if rendition_format == 'WEBP':
+                options['method'] = 4
+            elif rendition_format == 'JPEG':
+                options.update(optimize=True, progressive=True)
+            rendition.save(path, rendition_format, **options)
+
+            results.append({
+                'kind': kind,
+                'path': path,
+                'format': rendition_format.lower(),
+                'width': rendition.width,
+                'height': rendition.height,
+                'size': os.path.getsize(path),
+            })
+    return results
@@ -1,5 +1,6 @@
 from .extensions.batoto import BatoToSource
 from .extensions.mangadex import MangaDexSource
+from .extensions.mangadex_async import AsyncMangaDexSource
 from .extensions.demoniscans import MangaDemonSource
 from .extensions.interfaces.manga_source import MangaSource
 
@@ -36,6 +37,8 @@ if __name__ == '__main__':
         source = BatoToSource()
     if source_name == 'mangadex':
         source = MangaDexSource()
+    if source_name == 'mangadex-async':
+        source = AsyncMangaDexSource()
     if source_name == 'demonics':
         source = MangaDemonSource()
         
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Offline tests for image host selection, failover and hedging.
+
+Image hosts are stood in for by local http.server instances whose delay and
+status code can be changed per test, so no network access is needed.
+"""
+
+import sys
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import requests
+
+from extensions.image_hosts import ImageHostSelector
+
+
+class StandInHost:
+    """A local image host answering every GET with its name after a delay."""
+
+    def __init__(self, name, delay=0.0, status=200):
+        self.name = name
+        self.delay = delay
+        self.status = status
+        self.hits = 0
+        host = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                host.hits += 1
+                time.sleep(host.delay)
+                body = host.name.encode()
+                self.send_response(host.status)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def page_url(self):
+        return f"{self.base_url}/token/data/abc123/1.png"
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _get(url):
+    return requests.get(url, timeout=10)
+
+
+class StreamingGet:
+    """get() streaming like MangaDexSource._fetch_image, keeping every response."""
+
+    def __init__(self):
+        self.responses = []
+
+    def __call__(self, url):
+        response = requests.get(url, stream=True, timeout=10)
+        self.responses.append(response)
+        return response
+
+    def discarded_open(self, kept):
+        return [r for r in self.responses if r is not kept and not r.raw.closed]
+
+
+def _hosts(**node_options):
+    node = StandInHost('node', **node_options)
+    uploads = StandInHost('uploads')
+    return node, uploads
+
+
+def test_failover_on_server_error():
+    node, uploads = _hosts(status=503)
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/')
+        response = selector.fetch(node.page_url(), _get)
+        assert response.text == 'uploads'
+        assert node.hits == 1 and uploads.hits == 1
+    finally:
+        node.close()
+        uploads.close()
+
+
+def test_failover_on_connection_error():
+    node, uploads = _hosts()
+    url = node.page_url()
+    node.close()
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/')
+        response = selector.fetch(url, _get)
+        assert response.text == 'uploads'
+        assert selector.stats()[node.base_url]['error_rate'] == 1.0
+    finally:
+        uploads.close()
+
+
+def test_hedge_answers_from_fallback_when_node_is_slow():
+    node, uploads = _hosts(delay=2.0)
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/')
+        started = time.monotonic()
+        response = selector.fetch(node.page_url(), _get, hedge_after=0.1)
+        assert response.text == 'uploads'
+        assert time.monotonic() - started < 1.5
+    finally:
+        node.close()
+        uploads.close()
+
+
+def test_hedge_not_sent_when_node_is_fast():
+    node, uploads = _hosts()
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/')
+        response = selector.fetch(node.page_url(), _get, hedge_after=1.0)
+        assert response.text == 'node'
+        assert uploads.hits == 0
+    finally:
+        node.close()
+        uploads.close()
+
+
+def test_failed_responses_closed_on_failover():
+    node, uploads = _hosts(status=503)
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/')
+        get = StreamingGet()
+        response = selector.fetch(node.page_url(), get)
+        assert response.text == 'uploads'
+        assert len(get.responses) == 2 and not get.discarded_open(response)
+    finally:
+        node.close()
+        uploads.close()
+
+
+def test_other_response_closed_when_both_fail():
+    node, uploads = _hosts(status=503)
+    uploads.status = 502
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/')
+        get = StreamingGet()
+        response = selector.fetch(node.page_url(), get, hedge_after=0.5)
+        assert response.status_code in (502, 503)
+        assert len(get.responses) == 2 and not get.discarded_open(response)
+    finally:
+        node.close()
+        uploads.close()
+
+
+def test_slow_node_avoided_until_probation_ends():
+    # Uses the real monotonic clock: a slow host that never errors must
+    # still be avoided for the whole probation period.
+    node, uploads = _hosts(delay=0.2)
+    try:
+        selector = ImageHostSelector(uploads.base_url, path_start=r'/data/',
+                                     max_latency=0.1, min_samples=3, probation=1.0)
+        for _ in range(3):
+            assert selector.fetch(node.page_url(), _get).text == 'node'
+
+        assert not selector.is_healthy(node.base_url)
+        assert selector.choose(node.base_url) == uploads.base_url
+        response = selector.fetch(node.page_url(), _get)
+        assert response.text == 'uploads'
+        assert node.hits == 3
+
+        time.sleep(1.1)
+        assert selector.is_healthy(node.base_url)
+        assert selector.choose(node.base_url) == node.base_url
+    finally:
+        node.close()
+        uploads.close()
+
+
+def test_probation_counts_from_when_host_was_flagged():
+    now = [1000.0]
+    selector = ImageHostSelector('https://uploads.example', max_latency=5.0,
+                                 min_samples=3, probation=60.0, clock=lambda: now[0])
+    for _ in range(5):
+        selector.record('https://node.example/data/a/1.png', 12.0, ok=True)
+
+    now[0] += 59.0
+    assert not selector.is_healthy('https://node.example')
+    now[0] += 1.0
+    assert selector.is_healthy('https://node.example')
+
+
+def test_recovered_host_is_not_flagged():
+    selector = ImageHostSelector('https://uploads.example', alpha=1.0,
+                                 max_error_rate=0.3, min_samples=1)
+    selector.record('https://node.example/data/a/1.png', 0.1, ok=False)
+    assert not selector.is_healthy('https://node.example')
+    selector.record('https://node.example/data/a/1.png', 0.1, ok=True)
+    assert selector.is_healthy('https://node.example')
+
+
+if __name__ == "__main__":
+    for name, test in list(globals().items()):
+        if name.startswith('test_') and callable(test):
+            print(f"=== {name} ===")
+            test()
+    print("All image host tests passed")
@@ -0,0 +1,155 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterable, List, Optional
+
+from django.core.files import File
+from django.db import connection, transaction
+
+from ..models import MangaChapterPage, PageRendition, StoredFile
+from ..storage import ContentAddressedStorage, page_storage
+from .imaging import avif_supported, transcode_image
+
+
+# Rendition kind -> (max width or None to keep it, quality)
+RENDITIONS = {
+    PageRendition.FULL: (None, 85),
+    PageRendition.REDUCED: (1080, 75),
+    PageRendition.THUMBNAIL: (320, 65),
+}
+
+
+class PageTranscoder:
+    """
+    Produces the web renditions (full, reduced, thumbnail) of stored pages.
+
+    Decoding and encoding run in a process pool, one page per task, so
+    image work uses every core and never holds the GIL of the download
+    threads. Workers are spawned rather than forked (forking a threaded
+    Django process can deadlock) and only import jobs.imaging. They read
+    the original from its file path and write to a scratch directory; this
+    process saves the results to page storage and records them as
+    PageRendition rows next to the page.
+
+    submit() hands a chapter's pages over without waiting: one background
+    thread feeds them to the pool and stores the results, so the caller can
+    go on downloading the next chapter meanwhile.
+    """
+
+    def __init__(self, storage: Optional[ContentAddressedStorage] = None,
+                 max_workers: Optional[int] = None, image_format: Optional[str] = None):
+        """
+        Args:
+            storage: Storage holding the pages, defaults to page storage
+            max_workers: Worker processes, defaults to the number of cores
+            image_format: 'WEBP' or 'AVIF', defaults to AVIF when Pillow supports it
+        """
+        self.storage = storage or page_storage
+        self.max_workers = max_workers or os.cpu_count()
+        self.image_format = (image_format or ('AVIF' if avif_supported() else 'WEBP')).upper()
+        self._executor = None
+        self._collector = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def close(self):
+        """Wait for submitted chapters, then stop the workers."""
+        if self._collector is not None:
+            self._collector.shutdown()
+            self._collector = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def submit(self, pages: Iterable[MangaChapterPage]) -> Future:
+        """
+        Queue transcode(pages) in the background and return at once.
+        The future resolves to the created renditions.
+        """
+        with self._lock:
+            if self._collector is None:
+                self._collector = ThreadPoolExecutor(max_workers=1, thread_name_prefix='transcode')
+            return self._collector.submit(self._transcode_in_background, pages)
+
+    def _transcode_in_background(self, pages: Iterable[MangaChapterPage]) -> List[PageRendition]:
+        try:
+            return self.transcode(pages)
+        except Exception as e:
+            print(f"Error transcoding pages: {e}")
+            raise
+        finally:
+            # This thread's database connection, not the caller's
+            connection.close()
+
+    def transcode(self, pages: Iterable[MangaChapterPage]) -> List[PageRendition]:
+        """Create the missing renditions of the given pages, waiting for them."""
+        pages = [page for page in pages if page.file]
+        done = set(PageRendition.objects.filter(page__in=pages).values_list('page_id', flat=True))
+        pages = [page for page in pages if page.pk not in done]
+        if not pages:
+            return []
+
+        scratch = tempfile.mkdtemp(prefix='mediadex-transcode-')
+        try:
+            futures = []
+            for page in pages:
+                output_dir = os.path.join(scratch, str(page.pk))
+                os.makedirs(output_dir)
+                futures.append((page, self.executor.submit(
+                    transcode_image, self.storage.path(page.file.name), output_dir,
+                    self.image_format, RENDITIONS
+                )))
+
+            renditions = []
+            for page, future in futures:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # A broken image must not hold back the rest of the chapter
+                    print(f"Error transcoding page {page.pk}: {e}")
+                    continue
+                for result in results:
+                    with open(result['path'], 'rb') as f:
+                        name = self.storage.save(os.path.basename(result['path']), File(f))
+                    renditions.append(PageRendition(
+                        page=page,
+                        kind=result['kind'],
+                        file=name,
+                        format=result['format'],
+                        width=result['width'],
+                        height=result['height'],
+                        size=result['size']
+                    ))
+        finally:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+        with transaction.atomic():
+            # Another transcoder may have done some of these pages meanwhile:
+            # lock them and only insert the renditions still missing, so
+            # references are counted once per row
+            page_ids = {rendition.page_id for rendition in renditions}
+            list(MangaChapterPage.objects.select_for_update().filter(pk__in=page_ids).values_list('pk'))
+            existing = set(PageRendition.objects.filter(page_id__in=page_ids).values_list('page_id', 'kind'))
+            renditions = [rendition for rendition in renditions
+                          if (rendition.page_id, rendition.kind) not in existing]
+            PageRendition.objects.bulk_create(renditions)
+            StoredFile.add_references(rendition.file.name for rendition in renditions)
+        return renditions
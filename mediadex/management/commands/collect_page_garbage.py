@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from mediadex.storage import collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Delete stored page files that no MangaChapterPage refers to"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace', type=float, default=24,
+                            help="Hours a new file is kept before it can be collected")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Only report what would be deleted")
+
+    def handle(self, *args, **options):
+        freed = collect_garbage(grace=options['grace'] * 3600, dry_run=options['dry_run'])
+        verb = "Would free" if options['dry_run'] else "Freed"
+        self.stdout.write(f"{verb} {freed['files']} files, {freed['bytes'] / 1e6:.1f} MB")
@@ -0,0 +1,25 @@
+import mediadex.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediadex', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('references', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='mangachapterpage',
+            name='file',
+            field=models.FileField(default=None, storage=mediadex.storage.get_page_storage, upload_to=''),
+        ),
+    ]
@@ -0,0 +1,29 @@
+import django.db.models.deletion
+import mediadex.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('mediadex', '0002_storedfile_page_storage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PageRendition',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('full', 'Full'), ('reduced', 'Reduced'), ('thumbnail', 'Thumbnail')], max_length=16)),
+                ('file', models.FileField(storage=mediadex.storage.get_page_storage, upload_to='')),
+                ('format', models.CharField(max_length=8)),
+                ('width', models.IntegerField()),
+                ('height', models.IntegerField()),
+                ('size', models.IntegerField()),
+                ('page', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='renditions', to='mediadex.mangachapterpage')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('page', 'kind'), name='unique_page_rendition')],
+            },
+        ),
+    ]
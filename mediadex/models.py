@@ -1,4 +1,12 @@
+from collections import Counter
+from typing import Iterable
+
 from django.db import models
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from .storage import get_page_storage
 
 class Tag(models.Model):
     name = models.CharField(max_length=100)
@@ -32,12 +40,64 @@ class MangaChapter(models.Model):
 
 class MangaChapterPage(models.Model):
     number = models.IntegerField(default=1)
-    file = models.FileField(default=None)
+    file = models.FileField(default=None, storage=get_page_storage)
     chapter = models.ForeignKey(MangaChapter, on_delete=models.CASCADE, default=None)
     
     def __str__(self):
         return self.number
 
+class StoredFile(models.Model):
+    """Content-addressed page file and the number of pages and renditions using it."""
+    name = models.CharField(max_length=255, unique=True)
+    references = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.name} ({self.references})"
+    
+    @classmethod
+    def add_references(cls, names: Iterable[str], delta: int = 1):
+        """Change the reference counts of files, creating rows for new ones."""
+        counts = Counter(names)
+        if not counts:
+            return
+        cls.objects.bulk_create([cls(name=name) for name in counts], ignore_conflicts=True)
+        # One update per distinct count, usually a single query for a chapter
+        by_count = {}
+        for name, count in counts.items():
+            by_count.setdefault(count, []).append(name)
+        for count, group in by_count.items():
+            cls.objects.filter(name__in=group).update(references=F('references') + count * delta)
+
+class PageRendition(models.Model):
+    """Web-optimised copy of a page, the reader picks one by device."""
+    FULL = 'full'
+    REDUCED = 'reduced'
+    THUMBNAIL = 'thumbnail'
+    KINDS = [(FULL, 'Full'), (REDUCED, 'Reduced'), (THUMBNAIL, 'Thumbnail')]
+    
+    page = models.ForeignKey(MangaChapterPage, on_delete=models.CASCADE, related_name='renditions')
+    kind = models.CharField(max_length=16, choices=KINDS)
+    file = models.FileField(storage=get_page_storage)
+    format = models.CharField(max_length=8)
+    width = models.IntegerField()
+    height = models.IntegerField()
+    size = models.IntegerField()
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['page', 'kind'], name='unique_page_rendition'),
+        ]
+    
+    def __str__(self):
+        return f"{self.page_id} {self.kind} ({self.format}, {self.width}x{self.height})"
+
+@receiver(post_delete, sender=MangaChapterPage)
+@receiver(post_delete, sender=PageRendition)
+def release_page_file(sender, instance, **kwargs):
+    # The file itself is left to storage.collect_garbage()
+    if instance.file:
+        StoredFile.add_references([instance.file.name], -1)
+
 class MangaComment(models.Model):
     manga = models.ForeignKey(Manga, on_delete=models.CASCADE, default=None)
     comment = models.ForeignKey(Comment, on_delete=models.CASCADE, default=None)
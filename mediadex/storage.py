@@ -0,0 +1,257 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from itertools import islice
+from typing import Dict, Iterable, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.core.files.storage import FileSystemStorage
+from django.utils.functional import cached_property
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    File storage that names files after the sha256 of their content.
+
+    A file saved as "anything/0001.png" is stored as "ab/cd/abcd....png",
+    sharded on the first two byte pairs of the hash so no directory grows
+    past a few thousand entries. Saving content that is already stored
+    writes nothing and returns the existing name, so identical pages share
+    one file. Which pages use a file is tracked by the StoredFile model;
+    collect_garbage() removes files nothing refers to.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+    INCOMING_DIR = '.incoming'
+    TRASH_SUFFIX = '.trash'
+
+    @staticmethod
+    def hashed_name(digest: str, extension: str = '') -> str:
+        return f"{digest[:2]}/{digest[2:4]}/{digest}{extension.lower()}"
+
+    def get_available_name(self, name, max_length=None):
+        # Same name means same content, never rename
+        return name
+
+    def _save(self, name, content):
+        extension = os.path.splitext(name)[1]
+
+        # Hash while spooling to a temporary file next to the final location,
+        # then move it into place in one step
+        temp_dir = self.path(self.INCOMING_DIR)
+        os.makedirs(temp_dir, exist_ok=True)
+        sha256 = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=temp_dir, delete=False) as temp:
+            for chunk in content.chunks(self.CHUNK_SIZE):
+                sha256.update(chunk)
+                temp.write(chunk)
+
+        name = self.hashed_name(sha256.hexdigest(), extension)
+        full_path = self.path(name)
+        if os.path.exists(full_path):
+            try:
+                # Fresh mtime keeps the garbage collector's grace period from
+                # deleting it before the new reference is recorded
+                os.utime(full_path)
+            except FileNotFoundError:
+                pass  # Collected in the meantime, store it again
+            else:
+                os.remove(temp.name)
+                return name
+
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        if self.file_permissions_mode is not None:
+            os.chmod(temp.name, self.file_permissions_mode)
+        # A concurrent save of the same content replaces it with identical bytes
+        os.replace(temp.name, full_path)
+        return name
+
+    def discard(self, name: str, cutoff: float) -> Optional[int]:
+        """
+        Delete a file unless it was modified after cutoff, returning its size
+        or None if it was kept.
+
+        The file is first moved aside and its mtime checked there, so a save
+        of the same content that refreshed it just before the move keeps it
+        (it is moved back), and one just after finds it gone and writes it
+        again.
+        """
+        path = self.path(name)
+        trash_dir = self.path(self.INCOMING_DIR)
+        os.makedirs(trash_dir, exist_ok=True)
+        trash_path = os.path.join(
+            trash_dir, f"{os.path.basename(name)}.{os.getpid()}.{threading.get_ident()}{self.TRASH_SUFFIX}"
+        )
+        try:
+            os.rename(path, trash_path)
+        except FileNotFoundError:
+            return 0
+        stat = os.stat(trash_path)
+        if stat.st_mtime > cutoff:
+            try:
+                os.link(trash_path, path)
+            except FileExistsError:
+                pass  # Saved again meanwhile with the same content
+            os.remove(trash_path)
+            return None
+        os.remove(trash_path)
+        return stat.st_size
+
+    def sweep_incoming(self, cutoff: float, dry_run: bool = False) -> Dict[str, int]:
+        """
+        Clean up what crashed saves and discards left in .incoming before
+        cutoff (by ctime, which a rename refreshes).
+
+        Spooled temporary files are deleted. Files discard() had moved
+        aside are put back where they were, the next collection decides
+        about them again. Returns the number of files and bytes freed.
+        """
+        freed = {'files': 0, 'bytes': 0}
+        incoming = self.path(self.INCOMING_DIR)
+        try:
+            entries = list(os.scandir(incoming))
+        except FileNotFoundError:
+            return freed
+
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if stat.st_ctime > cutoff:
+                continue
+            trash = entry.name.endswith(self.TRASH_SUFFIX)
+            if dry_run:
+                if not trash:
+                    freed['files'] += 1
+                    freed['bytes'] += stat.st_size
+                continue
+
+            try:
+                if trash:
+                    # "<digest><ext>.<pid>.<thread>.trash"
+                    digest, extension = os.path.splitext(entry.name.rsplit('.', 3)[0])
+                    path = self.path(self.hashed_name(digest, extension))
+                    os.makedirs(os.path.dirname(path), exist_ok=True)
+                    try:
+                        os.link(entry.path, path)
+                    except FileExistsError:
+                        pass
+                else:
+                    freed['files'] += 1
+                    freed['bytes'] += stat.st_size
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+        return freed
+
+    def iter_files(self) -> Iterable[str]:
+        """Names of every stored file."""
+        for directory, subdirectories, files in os.walk(self.location):
+            subdirectories[:] = [d for d in subdirectories if d != self.INCOMING_DIR]
+            for filename in files:
+                yield os.path.relpath(os.path.join(directory, filename), self.location).replace(os.sep, '/')
+
+
+class PageStorage(ContentAddressedStorage):
+    """Content-addressed storage for page images under MEDIA_ROOT/pages."""
+
+    @cached_property
+    def base_location(self):
+        return self._value_or_setting(self._location, os.path.join(settings.MEDIA_ROOT, 'pages'))
+
+    @cached_property
+    def base_url(self):
+        return self._value_or_setting(self._base_url, f"{settings.MEDIA_URL}pages/")
+
+
+page_storage = PageStorage()
+
+
+def get_page_storage() -> PageStorage:
+    """Storage of MangaChapterPage.file, a callable so migrations do not freeze its paths."""
+    return page_storage
+
+
+GC_BATCH_SIZE = 1000
+
+
+def collect_garbage(storage: ContentAddressedStorage = None, grace: float = 24 * 3600,
+                    dry_run: bool = False) -> Dict[str, int]:
+    """
+    Delete files no page refers to.
+
+    Removes StoredFile rows whose reference count dropped to zero along with
+    their files, and files without any StoredFile row. Files younger than
+    grace seconds are left alone: downloads in progress store their pages
+    before the rows referring to them are created. Leftovers of crashed
+    saves in .incoming are swept once older than grace as well.
+
+    Rows and files are gone through GC_BATCH_SIZE at a time, so memory
+    does not grow with the size of the store.
+
+    Each row is locked, its count checked again and the row deleted before
+    its file, in one transaction, so a download adding a reference waits
+    for it and then stores the file anew.
+
+    Returns the number of files and bytes freed.
+    """
+    from .models import StoredFile
+
+    storage = storage or page_storage
+    cutoff = time.time() - grace
+    freed = {'files': 0, 'bytes': 0}
+
+    def remove(name: str) -> bool:
+        if dry_run:
+            try:
+                stat = os.stat(storage.path(name))
+            except FileNotFoundError:
+                return True
+            size = stat.st_size if stat.st_mtime <= cutoff else None
+        else:
+            size = storage.discard(name, cutoff)
+        if size is None:
+            return False
+        if size:
+            freed['files'] += 1
+            freed['bytes'] += size
+        return True
+
+    last_pk = 0
+    while True:
+        batch = list(StoredFile.objects.filter(references__lte=0, pk__gt=last_pk)
+                     .order_by('pk').values_list('pk', 'name')[:GC_BATCH_SIZE])
+        if not batch:
+            break
+        last_pk = batch[-1][0]
+        for pk, name in batch:
+            with transaction.atomic():
+                row = StoredFile.objects.select_for_update().filter(pk=pk, references__lte=0).first()
+                if row is None:
+                    continue
+                if dry_run:
+                    remove(name)
+                    continue
+                row.delete()
+                if not remove(name):
+                    # Too young: keep the row for the next run
+                    transaction.set_rollback(True)
+
+    files = storage.iter_files()
+    while True:
+        names = list(islice(files, GC_BATCH_SIZE))
+        if not names:
+            break
+        known = set(StoredFile.objects.filter(name__in=names).values_list('name', flat=True))
+        for name in names:
+            if name not in known:
+                remove(name)
+
+    swept = storage.sweep_incoming(cutoff, dry_run)
+    freed['files'] += swept['files']
+    freed['bytes'] += swept['bytes']
+    return freed
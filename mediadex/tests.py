@@ -1,3 +1,245 @@
+import mmap
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from unittest import mock
+
+from django.core.files.base import ContentFile
+from django.db import transaction
 from django.test import TestCase
 
-# Create your tests here.
+from .archive import ArchiveCache, MappedArchive, SeriesArchive, build_index
+from .models import Manga, MangaChapter, MangaChapterPage, StoredFile
+from .storage import ContentAddressedStorage, collect_garbage
+
+
+class StorageTestCase(TestCase):
+    """Runs against a throwaway content-addressed storage directory."""
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = ContentAddressedStorage(location=self.location)
+
+    def save(self, content: bytes, age: float = 0) -> str:
+        name = self.storage.save('page.png', ContentFile(content))
+        if age:
+            past = time.time() - age
+            os.utime(self.storage.path(name), (past, past))
+        return name
+
+
+class GarbageCollectionTests(StorageTestCase):
+
+    def test_collects_unreferenced_old_files_only(self):
+        referenced = self.save(b'referenced', age=7200)
+        released = self.save(b'released', age=7200)
+        orphan = self.save(b'orphan', age=7200)
+        young_orphan = self.save(b'young orphan')
+        StoredFile.add_references([referenced, released])
+        StoredFile.add_references([released], -1)
+
+        freed = collect_garbage(self.storage, grace=3600)
+
+        self.assertEqual(freed['files'], 2)
+        self.assertEqual(sorted(self.storage.iter_files()), sorted([referenced, young_orphan]))
+        self.assertEqual(list(StoredFile.objects.values_list('name', flat=True)), [referenced])
+
+    def test_dry_run_deletes_nothing(self):
+        orphan = self.save(b'orphan', age=7200)
+
+        freed = collect_garbage(self.storage, grace=3600, dry_run=True)
+
+        self.assertEqual(freed['files'], 1)
+        self.assertTrue(self.storage.exists(orphan))
+
+    def test_reference_added_before_the_row_is_locked_keeps_the_file(self):
+        name = self.save(b'page', age=7200)
+        StoredFile.objects.create(name=name, references=0)
+        atomic = transaction.atomic
+        added = []
+
+        def download_adds_reference(*args, **kwargs):
+            # Between the batch query and the row lock
+            if not added:
+                added.append(name)
+                StoredFile.add_references([name])
+            return atomic(*args, **kwargs)
+
+        with mock.patch.object(transaction, 'atomic', side_effect=download_adds_reference):
+            collect_garbage(self.storage, grace=3600)
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertEqual(StoredFile.objects.get(name=name).references, 1)
+
+    def test_too_young_file_keeps_its_row(self):
+        name = self.save(b'page')
+        StoredFile.objects.create(name=name, references=0)
+
+        collect_garbage(self.storage, grace=3600)
+
+        self.assertTrue(self.storage.exists(name))
+        self.assertTrue(StoredFile.objects.filter(name=name).exists())
+
+    def test_sweeps_crashed_saves_and_puts_discarded_files_back(self):
+        name = self.save(b'page')
+        incoming = self.storage.path(self.storage.INCOMING_DIR)
+        with open(os.path.join(incoming, 'tmpcrashed'), 'wb') as f:
+            f.write(b'partial')
+        # discard() died after moving the file aside
+        os.rename(self.storage.path(name), os.path.join(incoming, f"{os.path.basename(name)}.1.2.trash"))
+
+        freed = self.storage.sweep_incoming(time.time() + 1)
+
+        self.assertEqual(freed, {'files': 1, 'bytes': len(b'partial')})
+        self.assertEqual(os.listdir(incoming), [])
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'page')
+
+
+class DiscardTests(StorageTestCase):
+
+    def test_file_refreshed_by_a_save_is_kept(self):
+        name = self.save(b'page', age=7200)
+        self.save(b'page')  # Same content: refreshes the stored file
+
+        self.assertIsNone(self.storage.discard(name, time.time() - 3600))
+        self.assertTrue(self.storage.exists(name))
+
+    def test_save_while_the_file_is_moved_aside_stores_it_again(self):
+        name = self.save(b'page', age=7200)
+        real_stat = os.stat
+        saved = []
+
+        def stat_after_concurrent_save(path, *args, **kwargs):
+            if path.endswith('.trash') and not saved:
+                saved.append(self.save(b'page'))
+            return real_stat(path, *args, **kwargs)
+
+        with mock.patch('mediadex.storage.os.stat', side_effect=stat_after_concurrent_save):
+            size = self.storage.discard(name, time.time() - 3600)
+
+        self.assertEqual(saved, [name])
+        self.assertEqual(size, len(b'page'))
+        with self.storage.open(name) as f:
+            self.assertEqual(f.read(), b'page')
+
+    def test_old_file_is_deleted(self):
+        name = self.save(b'page', age=7200)
+
+        self.assertEqual(self.storage.discard(name, time.time() - 3600), len(b'page'))
+        self.assertFalse(self.storage.exists(name))
+        self.assertEqual(os.listdir(self.storage.path(self.storage.INCOMING_DIR)), [])
+
+
+class ReleasePageFileTests(StorageTestCase):
+
+    def test_deleting_pages_releases_their_files(self):
+        manga = Manga.objects.create(name='Manga')
+        chapter = MangaChapter.objects.create(name='Chapter', chapter=manga)
+        shared = self.save(b'shared')
+        pages = [MangaChapterPage.objects.create(number=number, chapter=chapter, file=shared)
+                 for number in (1, 2)]
+        StoredFile.add_references([shared, shared])
+
+        pages[0].delete()
+        self.assertEqual(StoredFile.objects.get(name=shared).references, 1)
+
+        chapter.delete()  # Cascades to the remaining page
+        self.assertEqual(StoredFile.objects.get(name=shared).references, 0)
+
+
+class SeriesArchiveTests(StorageTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.location, 'archives', '1.cbz')
+        self.archive = SeriesArchive(self.path, storage=self.storage)
+        manga = Manga.objects.create(name='Manga')
+        self.chapters = []
+        for number in (1, 2, 2):
+            chapter = MangaChapter.objects.create(name=f'Chapter {number}', number=number, chapter=manga)
+            for page in (1, 2):
+                name = self.save(f'{chapter.pk}-{page}'.encode() * 100)
+                MangaChapterPage.objects.create(number=page, chapter=chapter, file=name)
+            self.chapters.append(chapter)
+
+    def assert_archive_holds(self, chapters):
+        self.assertEqual(self.archive.chapter_ids(), {chapter.pk for chapter in chapters})
+        with zipfile.ZipFile(self.path) as archive:
+            self.assertIsNone(archive.testzip())
+        self.assertFalse(os.path.exists(self.archive.recovery_path))
+
+    def test_chapters_sharing_a_number_are_kept_apart(self):
+        self.assertEqual(self.archive.append(self.chapters), 3)
+
+        mapped = MappedArchive(self.path)
+        for chapter in self.chapters:
+            name = mapped.find(2, chapter.pk)
+            self.assertEqual(bytes(mapped.page(name)), f'{chapter.pk}-2'.encode() * 100)
+        mapped.close()
+
+    def test_opening_a_chapter_reads_ahead_the_next_one(self):
+        self.archive.append(reversed(self.chapters))
+        mapped = MappedArchive(self.path)
+        self.addCleanup(mapped.close)
+        first, second, third = (chapter.pk for chapter in self.chapters)
+
+        self.assertEqual(mapped.chapters, [first, second, third])
+        self.assertEqual(mapped.next_chapter(first), second)
+        self.assertIsNone(mapped.next_chapter(third))
+
+        cache = ArchiveCache()
+        with mock.patch.object(MappedArchive, 'prefetch', autospec=True) as prefetch:
+            cache.read_page(self.path, 2, first)
+            prefetch.assert_not_called()
+            cache.read_page(self.path, 1, first)
+        self.assertEqual(prefetch.call_args.args[1:], (second,))
+        if hasattr(mmap, 'MADV_WILLNEED'):
+            self.assertEqual(mapped.prefetch(second), 2)
+
+    def test_failed_append_restores_the_archive(self):
+        self.archive.append(self.chapters[:1])
+        with open(self.path, 'rb') as f:
+            before = f.read()
+
+        real_open = self.storage.open
+        opened = []
+
+        def fail_on_third_page(name, *args, **kwargs):
+            opened.append(name)
+            if len(opened) == 3:
+                raise OSError("disk full")
+            return real_open(name, *args, **kwargs)
+
+        with mock.patch.object(self.storage, 'open', side_effect=fail_on_third_page):
+            with self.assertRaises(OSError):
+                self.archive.append(self.chapters)
+
+        with open(self.path, 'rb') as f:
+            self.assertEqual(f.read(), before)
+        self.assert_archive_holds(self.chapters[:1])
+        self.assertEqual(self.archive.append(self.chapters), 2)
+        self.assert_archive_holds(self.chapters)
+
+    def test_interrupted_append_is_undone_by_the_next_one(self):
+        self.archive.append(self.chapters[:1])
+        index = build_index(self.path)
+        # Killed half way: recovery point saved, directory overwritten
+        self.archive._save_recovery_point()
+        with zipfile.ZipFile(self.path) as archive:
+            start_dir = archive.start_dir
+        with open(self.path, 'r+b') as f:
+            f.seek(start_dir)
+            f.write(b'half a page' * 100)
+            f.truncate()
+
+        self.assertTrue(self.archive.recover())
+        self.assertEqual(build_index(self.path), index)
+        self.assert_archive_holds(self.chapters[:1])
+        self.assertFalse(self.archive.recover())
+
+        self.assertEqual(self.archive.append(self.chapters), 2)
+        self.assert_archive_holds(self.chapters)
@@ -1,3 +1,37 @@
-from django.shortcuts import render
+import mimetypes
+import zipfile
 
-# Create your views here.
+from django.http import FileResponse, Http404, HttpResponse
+from django.views.decorators.http import require_GET
+
+from .archive import PageFile, archives, series_archive_path
+
+
+@require_GET
+def archive_page(request, manga_id: int, chapter_id: int, page_number: int):
+    """
+    Serve one page straight out of a series archive.
+
+    The archive is memory-mapped and its directory parsed once (see
+    archive.ArchiveCache). The page is streamed as memoryview slices of the
+    mapping: under a WSGI server with wsgi.file_wrapper they go to the
+    socket without being copied into Python bytes. Serving the first page
+    of a chapter reads ahead the start of the next one.
+    """
+    try:
+        found = archives.read_page(series_archive_path(manga_id), page_number, chapter_id)
+    except FileNotFoundError:
+        raise Http404("No archive for this manga")
+    except (zipfile.BadZipFile, OSError):
+        # Being written for the first time, or damaged until the next append recovers it
+        response = HttpResponse("Archive is being updated", status=503, content_type='text/plain')
+        response['Retry-After'] = '5'
+        return response
+    if found is None:
+        raise Http404("No such page")
+
+    name, content = found
+    response = FileResponse(PageFile(name, content),
+                            content_type=mimetypes.guess_type(name)[0] or 'application/octet-stream')
+    response['Cache-Control'] = 'public, max-age=86400'
+    return response
@@ -17,6 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path
 
+from mediadex import views
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('manga/<int:manga_id>/<int:chapter_id>/<int:page_number>',
+         views.archive_page, name='archive-page'),
 ]